@@ -0,0 +1,17 @@
+import numpy as np
+
+from .spatial import EARTH_RADIUS_KM
+
+
+def calculate_distances(lat, lon, points):
+    coords = np.radians(np.array(points, dtype=float).reshape(-1, 2))
+    lat, lon = np.radians(lat), np.radians(lon)
+    points_lat = coords[:, 0]
+    points_lon = coords[:, 1]
+
+    haversine = (
+        np.sin((points_lat - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(points_lat)
+        * np.sin((points_lon - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(haversine))
@@ -0,0 +1,181 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from star_burger.metrics import track_external_call
+
+from .models import AddressCoordinates
+
+
+YANDEX_GEOCODER_URL = 'https://geocode-maps.yandex.ru/1.x'
+LRU_SIZE = 1024
+GEOCODER_TIMEOUT = 10
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def normalize_address(address):
+    return ' '.join(address.split()).lower()
+
+
+def get_geocoder_params(address):
+    return {
+        'geocode': address,
+        'apikey': settings.YANDEX_API_KEY,
+        'format': 'json',
+    }
+
+
+def parse_coordinates(payload):
+    found_places = payload['response']['GeoObjectCollection']['featureMember']
+
+    if not found_places:
+        return None
+
+    most_relevant = found_places[0]
+    lon, lat = most_relevant['GeoObject']['Point']['pos'].split(' ')
+    return float(lon), float(lat)
+
+
+def fetch_coordinates(address):
+    with track_external_call('geocoder'):
+        response = requests.get(YANDEX_GEOCODER_URL, params=get_geocoder_params(address), timeout=GEOCODER_TIMEOUT)
+    response.raise_for_status()
+    return parse_coordinates(response.json())
+
+
+async def fetch_coordinates_async(address, timeout=GEOCODER_TIMEOUT):
+    with track_external_call('geocoder'):
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.get(YANDEX_GEOCODER_URL, params=get_geocoder_params(address))
+    response.raise_for_status()
+    return parse_coordinates(response.json())
+
+
+def get_expiry_date(updated_at, coordinates):
+    if coordinates:
+        ttl = settings.GEOCODER_CACHE_DAYS
+    else:
+        ttl = settings.GEOCODER_NOT_FOUND_CACHE_DAYS
+    return updated_at + timedelta(days=ttl)
+
+
+def remember(key, coordinates, expires_at):
+    with _lru_lock:
+        _lru[key] = (coordinates, expires_at)
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def recall(key, today):
+    with _lru_lock:
+        entry = _lru.get(key)
+        if not entry:
+            return False, None
+        coordinates, expires_at = entry
+        if expires_at <= today:
+            del _lru[key]
+            return False, None
+        _lru.move_to_end(key)
+        return True, coordinates
+
+
+def get_record_coordinates(record):
+    if record.lat is None or record.lon is None:
+        return None
+    return record.lon, record.lat
+
+
+def save_coordinates(key, coordinates):
+    save_coordinates_bulk({key: coordinates})
+
+
+def find_cached_coordinates(keys, chunk_size=500):
+    today = timezone.localdate()
+    keys = list(keys)
+    cached = {}
+    for start in range(0, len(keys), chunk_size):
+        records = AddressCoordinates.objects.filter(
+            address__in=keys[start:start + chunk_size]
+        )
+        for record in records:
+            coordinates = get_record_coordinates(record)
+            if get_expiry_date(record.updated_at, coordinates) > today:
+                cached[record.address] = coordinates
+    return cached
+
+
+def save_coordinates_bulk(coordinates_by_key):
+    records = []
+    for key, coordinates in coordinates_by_key.items():
+        lon, lat = coordinates or (None, None)
+        records.append(AddressCoordinates(address=key, lon=lon, lat=lat))
+    AddressCoordinates.objects.bulk_create(
+        records,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['address'],
+        update_fields=['lon', 'lat', 'updated_at'],
+    )
+
+
+def recall_record(key, record, today):
+    if not record:
+        return False, None
+    coordinates = get_record_coordinates(record)
+    expires_at = get_expiry_date(record.updated_at, coordinates)
+    if expires_at <= today:
+        return False, None
+    remember(key, coordinates, expires_at)
+    return True, coordinates
+
+
+def get_coordinates(address):
+    key = normalize_address(address)
+    today = timezone.localdate()
+
+    found, coordinates = recall(key, today)
+    if found:
+        return coordinates
+
+    record = AddressCoordinates.objects.filter(address=key).first()
+    found, coordinates = recall_record(key, record, today)
+    if found:
+        return coordinates
+
+    coordinates = fetch_coordinates(address)
+    save_coordinates(key, coordinates)
+    remember(key, coordinates, get_expiry_date(today, coordinates))
+    return coordinates
+
+
+async def get_coordinates_async(address, timeout=GEOCODER_TIMEOUT):
+    key = normalize_address(address)
+    today = timezone.localdate()
+
+    found, coordinates = recall(key, today)
+    if found:
+        return coordinates
+
+    record = await AddressCoordinates.objects.filter(address=key).afirst()
+    found, coordinates = recall_record(key, record, today)
+    if found:
+        return coordinates
+
+    coordinates = await fetch_coordinates_async(address, timeout)
+    await sync_to_async(save_coordinates)(key, coordinates)
+    remember(key, coordinates, get_expiry_date(today, coordinates))
+    return coordinates
+
+
+def clear_lru():
+    with _lru_lock:
+        _lru.clear()
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def normalize_address(address):
+    return ' '.join(address.split()).lower()
+
+
+def normalize_addresses(apps, schema_editor):
+    AddressCoordinates = apps.get_model('coordinates', 'AddressCoordinates')
+
+    records_by_key = {}
+    for record in AddressCoordinates.objects.order_by('id').iterator():
+        records_by_key.setdefault(normalize_address(record.address), []).append(record)
+
+    duplicate_ids = []
+    renamed_records = []
+    for key, records in records_by_key.items():
+        records.sort(key=lambda record: (record.updated_at, record.lat is not None), reverse=True)
+        kept_record, *duplicates = records
+        duplicate_ids.extend(record.id for record in duplicates)
+        if kept_record.address != key:
+            kept_record.address = key
+            renamed_records.append(kept_record)
+
+    AddressCoordinates.objects.filter(id__in=duplicate_ids).delete()
+    AddressCoordinates.objects.bulk_update(renamed_records, ['address'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coordinates', '0002_rename_lan_addresscoordinates_lon'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_addresses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+import heapq
+import math
+from collections import defaultdict
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    haversine = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(haversine))
+
+
+def get_bounding_box(lat, lon, radius):
+    lat_delta = radius / KM_PER_DEGREE
+    lon_delta = radius / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta
+
+
+class SpatialIndex:
+    def __init__(self, points, cell_size=0.1):
+        self.cell_size = cell_size
+        self.points = {key: (lat, lon) for key, lat, lon in points}
+        self.cells = defaultdict(list)
+        for key, (lat, lon) in self.points.items():
+            self.cells[self.get_cell(lat, lon)].append((key, lat, lon))
+        rows = [row for row, _ in self.cells]
+        cols = [col for _, col in self.cells]
+        self.bounds = (min(rows), max(rows), min(cols), max(cols)) if self.cells else None
+
+    def __len__(self):
+        return len(self.points)
+
+    def get_cell(self, lat, lon):
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def get_ring(self, row, col, ring):
+        if ring == 0:
+            return [(row, col)]
+        cells = []
+        for d_row in range(-ring, ring + 1):
+            if abs(d_row) == ring:
+                cells.extend((row + d_row, col + d_col) for d_col in range(-ring, ring + 1))
+            else:
+                cells.extend([(row + d_row, col - ring), (row + d_row, col + ring)])
+        return cells
+
+    def get_ring_min_distance(self, lat, ring):
+        if ring <= 1:
+            return 0
+        farthest_lat = min(abs(lat) + (ring + 1) * self.cell_size, 90)
+        return (ring - 1) * self.cell_size * KM_PER_DEGREE * math.cos(math.radians(farthest_lat))
+
+    def nearest(self, lat, lon, k=1, radius=None, accept=None, within=None):
+        if not self.cells or k < 1:
+            return []
+
+        row, col = self.get_cell(lat, lon)
+        min_row, max_row, min_col, max_col = self.bounds
+        max_ring = max(row - min_row, max_row - row, col - min_col, max_col - col)
+        found = []
+
+        def visit(cell):
+            for key, point_lat, point_lon in self.cells.get(cell, ()):
+                if accept and not accept(key):
+                    continue
+                distance = calculate_distance(lat, lon, point_lat, point_lon)
+                if radius is not None and distance > radius:
+                    continue
+                if within and not within(key, distance):
+                    continue
+                heapq.heappush(found, (-distance, key))
+                if len(found) > k:
+                    heapq.heappop(found)
+
+        for ring in range(max_ring + 1):
+            min_distance = self.get_ring_min_distance(lat, ring)
+            if radius is not None and min_distance > radius:
+                break
+            if len(found) == k and -found[0][0] <= min_distance:
+                break
+
+            ring_size = 8 * ring or 1
+            if ring_size > len(self.cells):
+                for cell_row, cell_col in self.cells:
+                    if max(abs(cell_row - row), abs(cell_col - col)) >= ring:
+                        visit((cell_row, cell_col))
+                break
+            for cell in self.get_ring(row, col, ring):
+                visit(cell)
+
+        return sorted((-distance, key) for distance, key in found)
@@ -1,3 +1,72 @@
-from django.test import TestCase
+import random
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .distances import calculate_distances
+from .spatial import SpatialIndex, calculate_distance
+
+
+class SpatialIndexTest(SimpleTestCase):
+    def setUp(self):
+        rnd = random.Random(42)
+        self.points = [
+            (number, 55.5 + rnd.random() * 0.5, 37.3 + rnd.random() * 0.6)
+            for number in range(300)
+        ]
+        self.points += [(300, 59.9, 30.3), (301, 43.1, 131.9)]
+        self.index = SpatialIndex(self.points)
+        self.queries = [
+            (55.5 + rnd.random() * 0.5, 37.3 + rnd.random() * 0.6)
+            for _ in range(20)
+        ]
+        self.queries += [(55.75, 37.62), (59.9, 30.3), (0, 0), (-33.9, 151.2)]
+
+    def find_nearest(self, lat, lon, k, radius=None, accept=None):
+        distances = [
+            (calculate_distance(lat, lon, point_lat, point_lon), key)
+            for key, point_lat, point_lon in self.points
+            if accept is None or accept(key)
+        ]
+        return sorted(
+            (distance, key)
+            for distance, key in distances
+            if radius is None or distance <= radius
+        )[:k]
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in self.queries:
+            for k in (1, 5, 50, 400):
+                for radius in (None, 0.5, 5, 30):
+                    with self.subTest(lat=lat, lon=lon, k=k, radius=radius):
+                        self.assertEqual(
+                            self.index.nearest(lat, lon, k=k, radius=radius),
+                            self.find_nearest(lat, lon, k, radius),
+                        )
+
+    def test_nearest_with_accept(self):
+        accept = {key for key, _, _ in self.points if key % 7 == 0}.__contains__
+        for lat, lon in self.queries:
+            with self.subTest(lat=lat, lon=lon):
+                self.assertEqual(
+                    self.index.nearest(lat, lon, k=10, accept=accept),
+                    self.find_nearest(lat, lon, 10, accept=accept),
+                )
+
+    def test_nearest_within(self):
+        def within(key, distance):
+            return distance <= key % 10
+
+        for lat, lon in self.queries:
+            with self.subTest(lat=lat, lon=lon):
+                self.assertEqual(
+                    self.index.nearest(lat, lon, k=5, within=within),
+                    [item for item in self.find_nearest(lat, lon, len(self.points)) if within(item[1], item[0])][:5],
+                )
+
+    def test_calculate_distances(self):
+        lat, lon = self.queries[0]
+        distances = calculate_distances(lat, lon, [(point_lat, point_lon) for _, point_lat, point_lon in self.points])
+        for distance, (_, point_lat, point_lon) in zip(distances, self.points):
+            self.assertAlmostEqual(distance, calculate_distance(lat, lon, point_lat, point_lon))
+
+    def test_empty_index(self):
+        self.assertEqual(SpatialIndex([]).nearest(55.75, 37.62, k=3), [])
@@ -1,3 +1,4 @@
+from django import forms
 from django.contrib import admin
 from django.shortcuts import reverse
 from django.templatetags.static import static
@@ -6,12 +7,14 @@ from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 
+from .capabilities import can_prepare
 from .models import Product
 from .models import ProductCategory
 from .models import Restaurant
 from .models import RestaurantMenuItem
 from .models import Order
 from .models import OrderItem
+from .models import GeocodingJob
 
 
 class RestaurantMenuItemInline(admin.TabularInline):
@@ -116,9 +119,33 @@ class OrderItemInline(admin.TabularInline):
     extra = 0
     fields = ['product', 'quantity', 'fixed_price']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'product':
+            if not hasattr(request, 'product_choices'):
+                request.product_choices = list(formfield.choices)
+            formfield.choices = request.product_choices
+        return formfield
+
+
+class OrderAdminForm(forms.ModelForm):
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def clean_restaurant(self):
+        restaurant = self.cleaned_data['restaurant']
+        if restaurant and 'restaurant' in self.changed_data and not can_prepare(self.instance, restaurant):
+            raise forms.ValidationError('Этот ресторан не может приготовить заказ!')
+        return restaurant
+
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
+    form = OrderAdminForm
     inlines = [OrderItemInline]
     list_display = [
         'id', 'first_name',
@@ -132,20 +159,23 @@ class OrderAdmin(admin.ModelAdmin):
         'payment_method'
     ]
     search_fields = ['first_name', 'phonenumber', 'address']
+    readonly_fields = ['total_cost']
 
     def save_model(self, request, obj, form, change):
         if 'restaurant' in form.changed_data and obj.restaurant:
             obj.order_status = 'RESTAURANT'
         super().save_model(request, obj, form, change)
 
+    def get_form(self, request, obj=None, **kwargs):
+        if not hasattr(request, 'restaurant_choices'):
+            request.restaurant_choices = (
+                obj.get_deliverable_restaurants() if obj else Restaurant.objects.none()
+            )
+        return super().get_form(request, obj, **kwargs)
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == 'restaurant':
-            order_id = request.resolver_match.kwargs.get('object_id')
-            if order_id:
-                order = Order.objects.get(id=order_id)
-                kwargs['queryset'] = order.get_available_restaurants()
-            else:
-                kwargs['queryset'] = Restaurant.objects.none()
+            kwargs['queryset'] = getattr(request, 'restaurant_choices', Restaurant.objects.none())
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
     def get_queryset(self, request):
@@ -163,3 +193,9 @@ class OrderAdmin(admin.ModelAdmin):
             if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts=None):
                 return HttpResponseRedirect(reverse('restaurateur:view_orders'))
         return super().response_change(request, obj)
+
+
+@admin.register(GeocodingJob)
+class GeocodingJobAdmin(admin.ModelAdmin):
+    list_display = ['order', 'attempts', 'run_after', 'last_error']
+    raw_id_fields = ['order']
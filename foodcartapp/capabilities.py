@@ -0,0 +1,99 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef
+
+
+CAPABILITIES_VERSION_KEY = 'foodcartapp:restaurant_capabilities_version'
+CAPABILITIES_VERSION_TIMEOUT = 10 * 60
+
+
+def get_products_mask(product_ids):
+    mask = 0
+    for product_id in product_ids:
+        mask |= 1 << product_id
+    return mask
+
+
+class RestaurantCapabilities:
+    def __init__(self):
+        self.masks = {}
+        self.version = None
+        self.lock = threading.Lock()
+
+    def rebuild(self, version):
+        from .models import RestaurantMenuItem
+
+        masks = {}
+        menu_items = (
+            RestaurantMenuItem.objects
+            .filter(availability=True)
+            .values_list('restaurant_id', 'product_id')
+        )
+        for restaurant_id, product_id in menu_items:
+            masks[restaurant_id] = masks.get(restaurant_id, 0) | 1 << product_id
+        self.masks = masks
+        self.version = version
+
+    def get_masks(self):
+        version = cache.get(CAPABILITIES_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(CAPABILITIES_VERSION_KEY, version, CAPABILITIES_VERSION_TIMEOUT)
+            version = cache.get(CAPABILITIES_VERSION_KEY, version)
+
+        with self.lock:
+            if version != self.version:
+                self.rebuild(version)
+            return self.masks
+
+    def invalidate(self, **kwargs):
+        cache.delete(CAPABILITIES_VERSION_KEY)
+
+    def update_menu_item(self, restaurant_id, product_id, available):
+        with self.lock:
+            is_current = self.version is not None and cache.get(CAPABILITIES_VERSION_KEY) == self.version
+            version = uuid.uuid4().hex
+            cache.set(CAPABILITIES_VERSION_KEY, version, CAPABILITIES_VERSION_TIMEOUT)
+            if not is_current:
+                self.version = None
+                return
+
+            mask = self.masks.get(restaurant_id, 0)
+            if available:
+                mask |= 1 << product_id
+            else:
+                mask &= ~(1 << product_id)
+            self.masks = {**self.masks, restaurant_id: mask}
+            self.version = version
+
+    def find_restaurant_ids(self, product_ids, masks=None):
+        if not product_ids:
+            return []
+        order_mask = get_products_mask(product_ids)
+        if masks is None:
+            masks = self.get_masks()
+        return [
+            restaurant_id
+            for restaurant_id, mask in masks.items()
+            if mask & order_mask == order_mask
+        ]
+
+
+restaurant_capabilities = RestaurantCapabilities()
+
+
+def can_prepare(order, restaurant):
+    from .models import RestaurantMenuItem
+
+    available_menu_items = RestaurantMenuItem.objects.filter(
+        restaurant=restaurant,
+        product=OuterRef('product'),
+        availability=True,
+    )
+    counts = order.order_items.aggregate(
+        items=Count('id'),
+        missing_items=Count('id', filter=~Exists(available_menu_items)),
+    )
+    return counts['items'] > 0 and not counts['missing_items']
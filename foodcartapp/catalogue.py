@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Product
+from .renderers import dumps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+CATALOGUE_CACHE_KEY = 'foodcartapp:product_catalogue:v2'
+PRODUCT_FIELDS = [
+    'id',
+    'name',
+    'price',
+    'special_status',
+    'description',
+    'category',
+    'image',
+    'restaurant',
+]
+PAGE_QUERY_PARAMS = {'category', 'special_status', 'cursor', 'limit', 'fields'}
+PAGE_SIZE = 20
+
+
+def serialize_product(product):
+    return {
+        'id': product.id,
+        'name': product.name,
+        'price': product.price,
+        'special_status': product.special_status,
+        'description': product.description,
+        'category': {
+            'id': product.category.id,
+            'name': product.category.name,
+        } if product.category else None,
+        'image': product.image.url,
+        'restaurant': {
+            'id': product.id,
+            'name': product.name,
+        }
+    }
+
+
+def get_catalogue_page(category=None, special_status=None, cursor=None, limit=PAGE_SIZE, fields=None):
+    products = (
+        Product.objects
+        .select_related('category')
+        .available()
+        .order_by('id')
+    )
+    if category is not None:
+        products = products.filter(category_id=category)
+    if special_status is not None:
+        products = products.filter(special_status=special_status)
+    if cursor is not None:
+        products = products.filter(id__gt=cursor)
+
+    next_cursor = None
+    products = list(products[:limit + 1])
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = products[-1].id
+
+    dumped_products = [serialize_product(product) for product in products]
+    if fields:
+        dumped_products = [
+            {field: dumped_product[field] for field in fields}
+            for dumped_product in dumped_products
+        ]
+    return dumped_products, next_cursor
+
+
+def build_catalogue():
+    products = Product.objects.select_related('category').available()
+    dumped_products = [serialize_product(product) for product in products]
+    content = dumps(dumped_products)
+    encoded_content = {'gzip': gzip.compress(content)}
+    if brotli:
+        encoded_content['br'] = brotli.compress(content)
+    return {
+        'content': content,
+        'encoded_content': encoded_content,
+        'etag': hashlib.md5(content).hexdigest(),
+        'last_modified': timezone.now().replace(microsecond=0),
+    }
+
+
+def get_catalogue():
+    catalogue = cache.get(CATALOGUE_CACHE_KEY)
+    if catalogue is None:
+        catalogue = build_catalogue()
+        cache.set(CATALOGUE_CACHE_KEY, catalogue, settings.CATALOGUE_CACHE_TIMEOUT)
+    return catalogue
+
+
+def invalidate_catalogue(**kwargs):
+    cache.delete(CATALOGUE_CACHE_KEY)
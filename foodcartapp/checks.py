@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            'Кэш по умолчанию не общий для процессов.',
+            hint=(
+                'Меню и координаты ресторанов хранятся в памяти каждого процесса, '
+                'а об изменениях процессы узнают через кэш. С локальным кэшем '
+                'воркеры и geocode_orders до 10 минут подбирают рестораны по старым данным. '
+                'Укажите общий CACHE_BACKEND, например FileBasedCache или Redis.'
+            ),
+            id='foodcartapp.W001',
+        )
+    ]
@@ -0,0 +1,56 @@
+from django.db.models import Count
+
+from .locations import rank_restaurants
+from .models import Order
+
+
+ACTIVE_ORDER_STATUSES = ['RESTAURANT', 'COURIER']
+
+
+def get_pending_orders():
+    return Order.objects.filter(
+        order_status='MANAGER',
+        restaurant__isnull=True,
+        address_lat__isnull=False,
+        address_lon__isnull=False,
+    )
+
+
+def get_restaurant_loads():
+    loads = (
+        Order.objects
+        .filter(order_status__in=ACTIVE_ORDER_STATUSES, restaurant__isnull=False)
+        .values('restaurant')
+        .annotate(active_orders=Count('id'))
+        .values_list('restaurant', 'active_orders')
+    )
+    return dict(loads)
+
+
+def dispatch_orders(orders):
+    orders = orders.order_by('created_at').with_available_restaurants()
+    loads = get_restaurant_loads()
+
+    dispatched_orders = []
+    for order in orders:
+        restaurants = [
+            restaurant
+            for restaurant in order.capable_restaurants
+            if restaurant.max_active_orders is None
+            or loads.get(restaurant.id, 0) < restaurant.max_active_orders
+        ]
+        while restaurants:
+            ranked_restaurants = rank_restaurants(order, restaurants, k=1)
+            restaurant, distance = ranked_restaurants[0] if ranked_restaurants else (None, None)
+            if distance is None:
+                break
+            try:
+                assigned = order.assign_restaurant(restaurant)
+            except ValueError:
+                restaurants.remove(restaurant)
+                continue
+            if assigned:
+                loads[restaurant.id] = loads.get(restaurant.id, 0) + 1
+                dispatched_orders.append(order)
+            break
+    return dispatched_orders
@@ -0,0 +1,31 @@
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+
+from coordinates.geocoder import get_coordinates_async
+
+from .dispatch import dispatch_orders, get_pending_orders
+
+
+def complete_geocoding_job(job, coordinates):
+    order = job.order
+    if coordinates:
+        order.address_lon, order.address_lat = coordinates
+        order.save(update_fields=['address_lon', 'address_lat', 'updated_at'])
+    job.delete()
+
+    if coordinates and settings.AUTO_DISPATCH:
+        dispatch_orders(get_pending_orders().filter(pk=order.pk))
+
+
+async def geocode_new_order(job):
+    try:
+        coordinates = await get_coordinates_async(
+            job.order.address,
+            timeout=settings.GEOCODER_CHECKOUT_TIMEOUT,
+        )
+        await sync_to_async(complete_geocoding_job)(job, coordinates)
+    except (httpx.HTTPError, KeyError, ValueError, DatabaseError):
+        return False
+    return True
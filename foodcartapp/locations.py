@@ -0,0 +1,117 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from coordinates.distances import calculate_distances
+from coordinates.spatial import SpatialIndex
+
+
+LOCATIONS_VERSION_KEY = 'foodcartapp:restaurant_locations_version'
+LOCATIONS_VERSION_TIMEOUT = 10 * 60
+
+
+class RestaurantLocations:
+    def __init__(self):
+        self.index = SpatialIndex([])
+        self.version = None
+        self.lock = threading.Lock()
+
+    def rebuild(self, version):
+        from .models import Restaurant
+
+        points = (
+            Restaurant.objects
+            .filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list('id', 'latitude', 'longitude')
+        )
+        self.index = SpatialIndex(points)
+        self.version = version
+
+    def get_index(self):
+        version = cache.get(LOCATIONS_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(LOCATIONS_VERSION_KEY, version, LOCATIONS_VERSION_TIMEOUT)
+            version = cache.get(LOCATIONS_VERSION_KEY, version)
+
+        with self.lock:
+            if version != self.version:
+                self.rebuild(version)
+            return self.index
+
+    def invalidate(self, **kwargs):
+        cache.set(LOCATIONS_VERSION_KEY, uuid.uuid4().hex, LOCATIONS_VERSION_TIMEOUT)
+
+    def find_nearest(self, lat, lon, restaurants, k=1):
+        located_restaurants = [
+            restaurant
+            for restaurant in restaurants
+            if restaurant.latitude is not None and restaurant.longitude is not None
+        ]
+        if k >= len(located_restaurants):
+            return rank_all_restaurants(lat, lon, located_restaurants)
+
+        index = self.get_index()
+        restaurants_by_id = {restaurant.id: restaurant for restaurant in located_restaurants}
+        radiuses = [restaurant.delivery_radius for restaurant in located_restaurants]
+        nearest = index.nearest(
+            lat, lon,
+            k=k,
+            radius=None if None in radiuses else max(radiuses),
+            accept=restaurants_by_id.__contains__,
+            within=lambda restaurant_id, distance: (
+                restaurants_by_id[restaurant_id].delivery_radius is None
+                or distance <= restaurants_by_id[restaurant_id].delivery_radius
+            ),
+        )
+
+        # Another process may have changed the coordinates after this index was built
+        is_stale = restaurants_by_id.keys() - index.points.keys() or any(
+            index.points[restaurant_id] != (
+                restaurants_by_id[restaurant_id].latitude,
+                restaurants_by_id[restaurant_id].longitude,
+            )
+            for _, restaurant_id in nearest
+        )
+        if is_stale:
+            return rank_all_restaurants(lat, lon, located_restaurants)[:k]
+        return [(distance, restaurants_by_id[restaurant_id]) for distance, restaurant_id in nearest]
+
+
+restaurant_locations = RestaurantLocations()
+
+
+def rank_all_restaurants(lat, lon, restaurants):
+    if not restaurants:
+        return []
+    distances = calculate_distances(
+        lat, lon,
+        [(restaurant.latitude, restaurant.longitude) for restaurant in restaurants],
+    )
+    return sorted(
+        (
+            (float(distance), restaurant)
+            for distance, restaurant in zip(distances, restaurants)
+            if restaurant.delivery_radius is None or distance <= restaurant.delivery_radius
+        ),
+        key=lambda item: item[0],
+    )
+
+
+def rank_restaurants(order, restaurants, k=None):
+    if order.address_lat is None or order.address_lon is None:
+        return [(restaurant, None) for restaurant in restaurants]
+
+    nearest = restaurant_locations.find_nearest(
+        order.address_lat, order.address_lon,
+        restaurants,
+        k=k or len(restaurants),
+    )
+    ranked_restaurants = [(restaurant, distance) for distance, restaurant in nearest]
+    unlocated_restaurants = [
+        (restaurant, None)
+        for restaurant in restaurants
+        if restaurant.latitude is None or restaurant.longitude is None
+    ]
+    return ranked_restaurants + unlocated_restaurants
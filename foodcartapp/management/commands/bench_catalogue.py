@@ -0,0 +1,47 @@
+import gzip
+import json
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import override_settings
+
+from foodcartapp.catalogue import brotli, serialize_product
+from foodcartapp.models import Product
+from foodcartapp.renderers import dumps
+
+
+def dumps_indented(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, indent=4).encode()
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает размер и время сериализации каталога товаров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1,
+            help='Во сколько раз размножить каталог',
+        )
+
+    def handle(self, *args, **options):
+        products = Product.objects.select_related('category').available()
+        data = [serialize_product(product) for product in products] * options['scale']
+
+        with override_settings(DEBUG=False):
+            encoders = [
+                ('json, indent=4', dumps_indented),
+                ('compact', dumps),
+            ]
+            for name, encode in encoders:
+                content = encode(data)
+                seconds = timeit.timeit(lambda: encode(data), number=options['repeat'])
+                sizes = [f'raw {len(content)} B', f'gzip {len(gzip.compress(content))} B']
+                if brotli:
+                    sizes.append(f'br {len(brotli.compress(content))} B')
+                self.stdout.write(
+                    f'{name:>15}: {seconds / options["repeat"] * 1000:.3f} ms, {", ".join(sizes)}'
+                )
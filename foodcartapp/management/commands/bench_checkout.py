@@ -0,0 +1,77 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+
+from foodcartapp.models import Order, Product
+
+from .load_test import get_percentile
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время оформления заказа с новым соединением к БД на каждый запрос и с постоянным'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--lines', type=int, default=3, help='Позиций в заказе')
+
+    def checkout(self, client, payload):
+        close_old_connections()
+        started_at = time.perf_counter()
+        response = client.post('/api/order/', json.dumps(payload), content_type='application/json')
+        elapsed = time.perf_counter() - started_at
+        close_old_connections()
+        if response.status_code != 200:
+            raise CommandError(f'Заказ не создан: {response.status_code} {response.content[:200]}')
+        return elapsed, response.json()['id']
+
+    def handle(self, *args, **options):
+        product_ids = list(Product.objects.available().values_list('id', flat=True)[:options['lines']])
+        if not product_ids:
+            raise CommandError('Нет товаров для заказа')
+        payload = {
+            'firstname': 'Тест',
+            'lastname': 'Производительности',
+            'phonenumber': '+79261234567',
+            'address': 'Москва, Красная площадь, 1',
+            'products': [{'product': product_id, 'quantity': 1} for product_id in product_ids],
+        }
+
+        configured_max_age = connection.settings_dict['CONN_MAX_AGE']
+        modes = [
+            ('новое соединение на запрос', 0),
+            (f'постоянное соединение, CONN_MAX_AGE={configured_max_age}', configured_max_age or 60),
+        ]
+        self.stdout.write(
+            f'БД: {connection.vendor}, '
+            f'режим pgbouncer: {connection.settings_dict["DISABLE_SERVER_SIDE_CURSORS"]}'
+        )
+
+        client = Client()
+        order_ids = []
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            try:
+                for name, max_age in modes:
+                    connection.close()
+                    connection.settings_dict['CONN_MAX_AGE'] = max_age
+                    order_ids.append(self.checkout(client, payload)[1])
+
+                    latencies = []
+                    for _ in range(options['requests']):
+                        elapsed, order_id = self.checkout(client, payload)
+                        latencies.append(elapsed * 1000)
+                        order_ids.append(order_id)
+                    latencies.sort()
+                    self.stdout.write(
+                        f'{name}: среднее {statistics.mean(latencies):.2f} мс, '
+                        f'p50 {get_percentile(latencies, 50):.2f} мс, '
+                        f'p95 {get_percentile(latencies, 95):.2f} мс, '
+                        f'p99 {get_percentile(latencies, 99):.2f} мс'
+                    )
+            finally:
+                connection.settings_dict['CONN_MAX_AGE'] = configured_max_age
+                Order.objects.filter(id__in=order_ids).delete()
@@ -0,0 +1,106 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+PROFILES = {
+    'production': {'DEBUG': 'False'},
+    'development': {'DEBUG': 'True'},
+}
+
+CHILD_SCRIPT = '''
+import json
+import sys
+import time
+
+started_at = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+startup_time = time.perf_counter() - started_at
+
+from django.conf import settings
+from django.test import Client, override_settings
+
+requests_count = int(sys.argv[1])
+paths = sys.argv[2:]
+
+
+def measure(path):
+    client = Client(REMOTE_ADDR='127.0.0.1')
+    for _ in range(10):
+        client.get(path)
+    started_at = time.perf_counter()
+    for _ in range(requests_count):
+        client.get(path)
+    return (time.perf_counter() - started_at) / requests_count
+
+
+requests = {}
+for path in paths:
+    with_middleware = measure(path)
+    with override_settings(MIDDLEWARE=[]):
+        without_middleware = measure(path)
+    requests[path] = {'total': with_middleware, 'middleware': with_middleware - without_middleware}
+
+print(json.dumps({
+    'startup': startup_time,
+    'middleware_count': len(settings.MIDDLEWARE),
+    'apps_count': len(settings.INSTALLED_APPS),
+    'requests': requests,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время запуска и накладные расходы middleware в прод- и дев-настройках'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startups', type=int, default=5, help='Сколько раз запустить процесс')
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на каждый адрес')
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Адрес для замера, можно указать несколько раз',
+        )
+
+    def run_profile(self, profile_env, options):
+        env = {
+            **os.environ,
+            **profile_env,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'star_burger.settings'),
+            'ALLOWED_HOSTS': ','.join([*settings.ALLOWED_HOSTS, 'testserver']),
+        }
+        env.pop('DEBUG_TOOLBAR', None)
+        paths = options['paths'] or ['/manager/login/', '/api/banners/']
+        runs = []
+        for _ in range(options['startups']):
+            process = subprocess.run(
+                [sys.executable, '-c', CHILD_SCRIPT, str(options['requests']), *paths],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if process.returncode:
+                raise CommandError(process.stderr)
+            runs.append(json.loads(process.stdout.strip().splitlines()[-1]))
+        return runs
+
+    def handle(self, *args, **options):
+        for profile, profile_env in PROFILES.items():
+            runs = self.run_profile(profile_env, options)
+            startup = statistics.median(run['startup'] for run in runs) * 1000
+            self.stdout.write(
+                f'{profile}: запуск {startup:.0f} мс, '
+                f'приложений {runs[0]["apps_count"]}, middleware {runs[0]["middleware_count"]}'
+            )
+            for path in runs[0]['requests']:
+                total = statistics.median(run['requests'][path]['total'] for run in runs) * 1000
+                middleware = statistics.median(run['requests'][path]['middleware'] for run in runs) * 1000
+                self.stdout.write(f'  {path}: {total:.2f} мс на запрос, из них middleware {middleware:.2f} мс')
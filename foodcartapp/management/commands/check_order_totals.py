@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Coalesce
+
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Сверяет сохранённую стоимость заказов с суммой по позициям'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Исправить расходящиеся суммы',
+        )
+
+    def handle(self, *args, **options):
+        mismatched_orders = list(
+            Order.objects
+            .with_calculated_total_cost()
+            .annotate(expected_total_cost=Coalesce(
+                'calculated_total_cost',
+                Value(0),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ))
+            .exclude(total_cost=F('expected_total_cost'))
+        )
+        for order in mismatched_orders:
+            self.stdout.write(
+                f'{order}: сохранено {order.total_cost}, по позициям {order.expected_total_cost}'
+            )
+
+        if not mismatched_orders:
+            self.stdout.write('Все суммы заказов совпадают')
+            return
+
+        if options['fix']:
+            for order in mismatched_orders:
+                order.total_cost = order.expected_total_cost
+            Order.objects.bulk_update(mismatched_orders, ['total_cost'], batch_size=500)
+            self.stdout.write(f'Исправлено заказов: {len(mismatched_orders)}')
+        else:
+            raise CommandError(f'Суммы не совпадают у {len(mismatched_orders)} заказов')
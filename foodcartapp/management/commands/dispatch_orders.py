@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.dispatch import dispatch_orders, get_pending_orders
+
+
+class Command(BaseCommand):
+    help = 'Передаёт ожидающие заказы ближайшим ресторанам, которые могут их приготовить'
+
+    def handle(self, *args, **options):
+        dispatched_orders = dispatch_orders(get_pending_orders())
+        for order in dispatched_orders:
+            self.stdout.write(f'{order}: {order.restaurant}')
+        self.stdout.write(f'Распределено заказов: {len(dispatched_orders)}')
@@ -0,0 +1,145 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from coordinates.geocoder import (
+    fetch_coordinates,
+    find_cached_coordinates,
+    normalize_address,
+    save_coordinates_bulk,
+)
+from foodcartapp.locations import restaurant_locations
+from foodcartapp.models import GeocodingJob, Order, Restaurant
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second
+        self.next_request_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            request_at = max(now, self.next_request_at)
+            self.next_request_at = request_at + self.interval
+        time.sleep(request_at - now)
+
+
+def update_coordinates(objects_by_key, coordinates_by_key, lat_field, lon_field):
+    updated = []
+    for key, coordinates in coordinates_by_key.items():
+        if not coordinates:
+            continue
+        lon, lat = coordinates
+        for obj in objects_by_key.get(key, ()):
+            setattr(obj, lon_field, lon)
+            setattr(obj, lat_field, lat)
+            updated.append(obj)
+    return updated
+
+
+def group_by_address(objects):
+    objects_by_key = {}
+    for obj in objects:
+        if obj.address:
+            objects_by_key.setdefault(normalize_address(obj.address), []).append(obj)
+    return objects_by_key
+
+
+class Command(BaseCommand):
+    help = 'Геокодирует адреса всех ресторанов и заказов без координат'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=10,
+            help='Максимум запросов к геокодеру в секунду',
+        )
+        parser.add_argument(
+            '--save-every',
+            type=int,
+            default=100,
+            help='Сохранять найденные координаты каждые N адресов',
+        )
+
+    def save_geocoded(self, coordinates_by_key, restaurants_by_key, orders_by_key):
+        geocoded_restaurants = update_coordinates(
+            restaurants_by_key, coordinates_by_key, 'latitude', 'longitude'
+        )
+        Restaurant.objects.bulk_update(geocoded_restaurants, ['latitude', 'longitude'], batch_size=500)
+        if geocoded_restaurants:
+            restaurant_locations.invalidate()
+
+        geocoded_orders = update_coordinates(orders_by_key, coordinates_by_key, 'address_lat', 'address_lon')
+        updated_at = timezone.now()
+        for order in geocoded_orders:
+            order.updated_at = updated_at
+        Order.objects.bulk_update(
+            geocoded_orders,
+            ['address_lat', 'address_lon', 'updated_at'],
+            batch_size=500,
+        )
+        GeocodingJob.objects.filter(order__in=geocoded_orders).delete()
+        return len(geocoded_orders)
+
+    def handle(self, *args, **options):
+        restaurants_by_key = group_by_address(
+            Restaurant.objects.only('id', 'address', 'latitude', 'longitude')
+        )
+        orders_by_key = group_by_address(
+            Order.objects
+            .filter(address_lat__isnull=True)
+            .only('id', 'address', 'address_lat', 'address_lon', 'updated_at')
+        )
+
+        addresses = {}
+        for key, objects in [*restaurants_by_key.items(), *orders_by_key.items()]:
+            addresses.setdefault(key, objects[0].address)
+
+        cached_coordinates = find_cached_coordinates(addresses)
+        missing_keys = [key for key in addresses if key not in cached_coordinates]
+        self.stdout.write(
+            f'Адресов: {len(addresses)}, в кэше: {len(cached_coordinates)}, '
+            f'нужно геокодировать: {len(missing_keys)}'
+        )
+        geocoded_orders_count = self.save_geocoded(cached_coordinates, restaurants_by_key, orders_by_key)
+
+        rate_limiter = RateLimiter(options['rate'])
+
+        def geocode(key):
+            rate_limiter.wait()
+            try:
+                return key, fetch_coordinates(addresses[key]), None
+            except (requests.RequestException, KeyError, ValueError) as error:
+                return key, None, error
+
+        def save_fetched():
+            save_coordinates_bulk(fetched)
+            return self.save_geocoded(fetched, restaurants_by_key, orders_by_key)
+
+        fetched = {}
+        executor = ThreadPoolExecutor(max_workers=options['workers'])
+        try:
+            futures = [executor.submit(geocode, key) for key in missing_keys]
+            for future in as_completed(futures):
+                key, coordinates, error = future.result()
+                if error:
+                    self.stderr.write(f'{addresses[key]}: {error}')
+                    continue
+                fetched[key] = coordinates
+                if len(fetched) >= options['save_every']:
+                    geocoded_orders_count += save_fetched()
+                    fetched = {}
+        finally:
+            # Keep what was already fetched if the run is interrupted
+            executor.shutdown(wait=False, cancel_futures=True)
+            geocoded_orders_count += save_fetched()
+
+        self.stdout.write(f'Геокодировано заказов: {geocoded_orders_count}')
@@ -0,0 +1,76 @@
+import time
+from datetime import timedelta
+
+import requests
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from coordinates.geocoder import GEOCODER_TIMEOUT, get_coordinates
+from foodcartapp.geocoding import complete_geocoding_job
+from foodcartapp.models import GeocodingJob, OrderEvent
+
+EVENTS_PRUNE_INTERVAL = 60
+
+
+def get_lease_time(batch_size):
+    # requests applies the timeout to connecting and to reading separately
+    return GeocodingJob.RETRY_DELAY + batch_size * timedelta(seconds=2 * GEOCODER_TIMEOUT)
+
+
+def claim_jobs(batch_size):
+    with transaction.atomic():
+        jobs = list(
+            GeocodingJob.objects
+            .due()
+            .select_for_update(skip_locked=True)
+            .select_related('order')
+            .order_by('run_after')[:batch_size]
+        )
+        GeocodingJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            run_after=timezone.now() + get_lease_time(batch_size)
+        )
+    return jobs
+
+
+def process_job(job):
+    try:
+        coordinates = get_coordinates(job.order.address)
+    except (requests.RequestException, KeyError, ValueError) as error:
+        job.schedule_retry(error)
+        return False
+
+    complete_geocoding_job(job, coordinates)
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Заполняет координаты адресов заказов из очереди геокодирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--sleep', type=float, default=5)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать очередь один раз и выйти',
+        )
+
+    def handle(self, *args, **options):
+        events_pruned_at = None
+        while True:
+            if events_pruned_at is None or time.monotonic() - events_pruned_at > EVENTS_PRUNE_INTERVAL:
+                OrderEvent.objects.expired().delete()
+                events_pruned_at = time.monotonic()
+
+            jobs = claim_jobs(options['batch_size'])
+            for job in jobs:
+                if process_job(job):
+                    self.stdout.write(f'{job.order}: координаты получены')
+                else:
+                    self.stderr.write(f'{job.order}: ошибка, попытка {job.attempts}')
+
+            if options['once'] and not jobs:
+                return
+            if not jobs:
+                time.sleep(options['sleep'])
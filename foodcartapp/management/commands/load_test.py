@@ -0,0 +1,171 @@
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from .seed_load_data import read_fixture
+
+
+DEFAULT_MIX = 'products=50,banners=20,order=10,manager_orders=20'
+QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def get_percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class LoadTestClient:
+    def __init__(self, base_url, username, password, product_ids, addresses, rnd):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.product_ids = product_ids
+        self.addresses = addresses
+        self.rnd = rnd
+        self.session = requests.Session()
+        self.manager_session = None
+
+    def get_url(self, path):
+        return urljoin(self.base_url, path)
+
+    def login(self):
+        session = requests.Session()
+        login_url = self.get_url('/manager/login/')
+        session.get(login_url, timeout=30).raise_for_status()
+        response = session.post(login_url, data={
+            'username': self.username,
+            'password': self.password,
+            'csrfmiddlewaretoken': session.cookies.get('csrftoken', ''),
+        }, headers={'Referer': login_url}, timeout=30)
+        response.raise_for_status()
+        if 'sessionid' not in session.cookies:
+            raise CommandError(f'Не удалось войти как {self.username}')
+        self.manager_session = session
+
+    def products(self):
+        return self.session.get(self.get_url('/api/products/'), timeout=30)
+
+    def banners(self):
+        return self.session.get(self.get_url('/api/banners/'), timeout=30)
+
+    def order(self):
+        lines_count = self.rnd.randint(1, min(5, len(self.product_ids)))
+        return self.session.post(self.get_url('/api/order/'), json={
+            'firstname': 'Нагрузочный',
+            'lastname': 'Тест',
+            'phonenumber': '+79261234567',
+            'address': self.rnd.choice(self.addresses),
+            'products': [
+                {'product': product_id, 'quantity': self.rnd.randint(1, 3)}
+                for product_id in self.rnd.sample(self.product_ids, lines_count)
+            ],
+        }, timeout=30)
+
+    def manager_orders(self):
+        if not self.manager_session:
+            self.login()
+        return self.manager_session.get(self.get_url('/manager/orders/'), timeout=30)
+
+
+class Command(BaseCommand):
+    help = 'Нагружает запущенный сайт смесью запросов и выводит задержки по эндпоинтам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--duration', type=float, default=60, help='Длительность теста в секундах')
+        parser.add_argument('--concurrency', type=int, default=8, help='Число одновременных клиентов')
+        parser.add_argument(
+            '--mix',
+            default=DEFAULT_MIX,
+            help=f'Доли запросов к эндпоинтам, по умолчанию {DEFAULT_MIX}',
+        )
+        parser.add_argument('--fixture', default='data.json', help='Откуда брать адреса заказов')
+        parser.add_argument('--manager-username', default='loadtest')
+        parser.add_argument('--manager-password', default='loadtest')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        weights = parse_mix(options['mix'])
+        unknown = set(weights) - {'products', 'banners', 'order', 'manager_orders'}
+        if unknown:
+            raise CommandError(f'Неизвестные эндпоинты: {", ".join(sorted(unknown))}')
+        endpoints = list(weights)
+
+        catalogue = requests.get(urljoin(options['url'], '/api/products/'), timeout=30)
+        catalogue.raise_for_status()
+        product_ids = [product['id'] for product in catalogue.json()]
+        if not product_ids:
+            raise CommandError('В каталоге нет товаров, сначала запустите seed_load_data')
+        addresses = sorted({
+            record['fields']['address']
+            for record in read_fixture(options['fixture']).get('foodcartapp.order', [])
+        }) or ['Москва, Красная площадь, 1']
+
+        results = {endpoint: [] for endpoint in endpoints}
+        results_lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def run_client(client_number):
+            rnd = random.Random(options['seed'] + client_number)
+            client = LoadTestClient(
+                options['url'],
+                options['manager_username'],
+                options['manager_password'],
+                product_ids,
+                addresses,
+                rnd,
+            )
+            while time.monotonic() < deadline:
+                endpoint = rnd.choices(endpoints, [weights[name] for name in endpoints])[0]
+                started_at = time.perf_counter()
+                try:
+                    response = getattr(client, endpoint)()
+                    ok = response.status_code < 400
+                    queries_count = response.headers.get(QUERY_COUNT_HEADER)
+                except requests.RequestException:
+                    ok, queries_count = False, None
+                elapsed = time.perf_counter() - started_at
+                with results_lock:
+                    results[endpoint].append((elapsed, ok, queries_count))
+
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(run_client, range(options['concurrency'])))
+        wall_time = time.monotonic() - started_at
+
+        self.report(results, wall_time)
+
+    def report(self, results, wall_time):
+        self.stdout.write(
+            f'{"эндпоинт":<16}{"запросов":>10}{"ошибок":>8}{"rps":>8}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"SQL":>8}'
+        )
+        total = 0
+        for endpoint, samples in results.items():
+            total += len(samples)
+            latencies = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+            errors = sum(1 for _, ok, _ in samples if not ok)
+            queries = [int(count) for _, _, count in samples if count is not None]
+            queries_avg = f'{sum(queries) / len(queries):.1f}' if queries else '—'
+            self.stdout.write(
+                f'{endpoint:<16}{len(samples):>10}{errors:>8}{len(samples) / wall_time:>8.1f}'
+                f'{get_percentile(latencies, 50):>10.1f}{get_percentile(latencies, 95):>10.1f}'
+                f'{get_percentile(latencies, 99):>10.1f}{queries_avg:>8}'
+            )
+        self.stdout.write(f'Всего: {total} запросов за {wall_time:.1f} с, {total / wall_time:.1f} rps')
@@ -0,0 +1,175 @@
+import json
+import random
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from foodcartapp.capabilities import restaurant_capabilities
+from foodcartapp.catalogue import invalidate_catalogue
+from foodcartapp.locations import restaurant_locations
+from foodcartapp.models import (
+    Order,
+    OrderItem,
+    Product,
+    ProductCategory,
+    Restaurant,
+    RestaurantMenuItem,
+)
+
+
+MOSCOW_CENTER = (55.751, 37.618)
+BATCH_SIZE = 1000
+
+
+def read_fixture(path):
+    with open(path, encoding='utf-8') as file:
+        records = json.load(file)
+    fixture = {}
+    for record in records:
+        fixture.setdefault(record['model'], []).append(record)
+    return fixture
+
+
+def get_coordinates_by_address(fixture):
+    return {
+        record['fields']['address']: (record['fields']['lat'], record['fields']['lon'])
+        for record in fixture.get('coordinates.addresscoordinates', [])
+        if record['fields']['lat'] is not None
+    }
+
+
+def get_jittered_coordinates(rnd, spread=0.15):
+    lat, lon = MOSCOW_CENTER
+    return lat + rnd.uniform(-spread, spread), lon + rnd.uniform(-spread * 2, spread * 2)
+
+
+class Command(BaseCommand):
+    help = 'Наполняет базу данными из фикстуры, размноженными для нагрузочного тестирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default='data.json')
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=50,
+            help='Во сколько раз размножить рестораны и товары фикстуры',
+        )
+        parser.add_argument(
+            '--orders',
+            type=int,
+            default=10000,
+            help='Сколько заказов создать по образцу заказов фикстуры',
+        )
+        parser.add_argument('--manager-username', default='loadtest')
+        parser.add_argument('--manager-password', default='loadtest')
+        parser.add_argument('--seed', type=int, default=1)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        fixture = read_fixture(options['fixture'])
+        coordinates_by_address = get_coordinates_by_address(fixture)
+        scale = options['scale']
+
+        categories = {
+            record['pk']: ProductCategory.objects.get_or_create(name=record['fields']['name'])[0]
+            for record in fixture['foodcartapp.productcategory']
+        }
+
+        products = {}
+        restaurants = {}
+        for copy_number in range(1, scale + 1):
+            for record in fixture['foodcartapp.product']:
+                fields = record['fields']
+                products[copy_number, record['pk']] = Product(
+                    name=f'{fields["name"]} #{copy_number}',
+                    category=categories.get(fields['category']),
+                    price=Decimal(fields['price']),
+                    image=fields['image'],
+                    special_status=fields['special_status'],
+                    description=fields['description'],
+                )
+            for record in fixture['foodcartapp.restaurant']:
+                fields = record['fields']
+                lat, lon = get_jittered_coordinates(rnd)
+                restaurants[copy_number, record['pk']] = Restaurant(
+                    name=f'{fields["name"]} #{copy_number}',
+                    address=fields['address'],
+                    contact_phone=fields['contact_phone'],
+                    latitude=lat,
+                    longitude=lon,
+                )
+        Product.objects.bulk_create(products.values(), batch_size=BATCH_SIZE)
+        Restaurant.objects.bulk_create(restaurants.values(), batch_size=BATCH_SIZE)
+
+        menu_items = []
+        for (copy_number, restaurant_pk), restaurant in restaurants.items():
+            for record in fixture['foodcartapp.restaurantmenuitem']:
+                fields = record['fields']
+                if fields['restaurant'] != restaurant_pk:
+                    continue
+                for product_copy in range(1, scale + 1):
+                    menu_items.append(RestaurantMenuItem(
+                        restaurant=restaurant,
+                        product=products[product_copy, fields['product']],
+                        availability=fields['availability'],
+                    ))
+        RestaurantMenuItem.objects.bulk_create(menu_items, batch_size=BATCH_SIZE)
+
+        items_by_order = {}
+        for record in fixture['foodcartapp.orderitem']:
+            items_by_order.setdefault(record['fields']['order'], []).append(record['fields'])
+        sample_orders = [
+            record for record in fixture['foodcartapp.order']
+            if record['pk'] in items_by_order
+        ]
+
+        orders = []
+        order_items = []
+        for _ in range(options['orders']):
+            record = rnd.choice(sample_orders)
+            fields = record['fields']
+            copy_number = rnd.randint(1, scale)
+            lat, lon = coordinates_by_address.get(fields['address']) or get_jittered_coordinates(rnd)
+            order = Order(
+                first_name=fields['first_name'],
+                last_name=fields['last_name'],
+                phonenumber=fields.get('phonenumber') or fields.get('phone_number'),
+                address=fields['address'],
+                order_status=rnd.choice(['MANAGER', 'MANAGER', 'RESTAURANT', 'COURIER', 'COMPLETED']),
+                payment_method=fields['payment_method'],
+                comment=fields['comment'],
+                address_lat=lat,
+                address_lon=lon,
+            )
+            total_cost = Decimal(0)
+            for item in items_by_order[record['pk']]:
+                fixed_price = Decimal(item['fixed_price'])
+                total_cost += fixed_price * item['quantity']
+                order_items.append(OrderItem(
+                    order=order,
+                    product=products[copy_number, item['product']],
+                    quantity=item['quantity'],
+                    fixed_price=fixed_price,
+                ))
+            order.total_cost = total_cost
+            orders.append(order)
+        Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+        OrderItem.objects.bulk_create(order_items, batch_size=BATCH_SIZE)
+
+        manager, _ = User.objects.get_or_create(username=options['manager_username'])
+        manager.is_staff = True
+        manager.set_password(options['manager_password'])
+        manager.save()
+
+        transaction.on_commit(invalidate_catalogue)
+        transaction.on_commit(restaurant_capabilities.invalidate)
+        transaction.on_commit(restaurant_locations.invalidate)
+
+        self.stdout.write(
+            f'Создано ресторанов: {len(restaurants)}, товаров: {len(products)}, '
+            f'позиций меню: {len(menu_items)}, заказов: {len(orders)}, '
+            f'позиций заказов: {len(order_items)}'
+        )
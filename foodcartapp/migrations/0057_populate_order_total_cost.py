@@ -0,0 +1,27 @@
+# Generated by Django 4.2.21 on 2026-10-18 20:36
+
+from django.db import migrations
+from django.db.models import F, Sum
+
+
+def populate_total_cost(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    orders = Order.objects.annotate(
+        calculated_total_cost=Sum(F('order_items__quantity') * F('order_items__fixed_price'))
+    )
+    updated_orders = []
+    for order in orders.iterator():
+        order.total_cost = order.calculated_total_cost or 0
+        updated_orders.append(order)
+    Order.objects.bulk_update(updated_orders, ['total_cost'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0056_order_total_cost'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_total_cost, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.21 on 2026-10-18 20:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0058_order_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CREATED', 'Создан'), ('STATUS_CHANGED', 'Изменён статус')], max_length=20, verbose_name='Событие')),
+                ('order_status', models.CharField(choices=[('MANAGER', 'Менеджер'), ('RESTAURANT', 'Ресторан'), ('COURIER', 'Курьер'), ('COMPLETED', 'Завершён')], max_length=50, verbose_name='Статус заказа')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата события')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='foodcartapp.order', verbose_name='Заказ')),
+            ],
+            options={
+                'verbose_name': 'событие заказа',
+                'verbose_name_plural': 'события заказов',
+            },
+        ),
+    ]
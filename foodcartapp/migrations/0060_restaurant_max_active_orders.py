@@ -0,0 +1,18 @@
+# Generated by Django 4.2.21 on 2026-10-18 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0059_orderevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='max_active_orders',
+            field=models.PositiveIntegerField(blank=True, help_text='Для автоматического распределения заказов. Пусто — без ограничений', null=True, verbose_name='максимум заказов в работе'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.21 on 2026-10-18 20:42
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0060_restaurant_max_active_orders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='delivery_radius',
+            field=models.FloatField(blank=True, help_text='Пусто — без ограничений', null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='радиус доставки, км'),
+        ),
+        # Existing restaurants keep delivering without a limit, new ones get 10 km
+        migrations.AlterField(
+            model_name='restaurant',
+            name='delivery_radius',
+            field=models.FloatField(blank=True, default=10, help_text='Пусто — без ограничений', null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='радиус доставки, км'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['latitude', 'longitude'], name='foodcartapp_latitud_a14c03_idx'),
+        ),
+    ]
@@ -1,14 +1,43 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from phonenumber_field.modelfields import PhoneNumberField
-from django.db.models import F, Sum, Count, Q
+from django.db.models import Case, F, Max, Sum, Q, When
 from django.utils import timezone
 
+from coordinates.spatial import calculate_distance, get_bounding_box
+
+from .capabilities import can_prepare, restaurant_capabilities
+
 
 class OrderQuerySet(models.QuerySet):
-    def with_total_cost(self):
+    def with_calculated_total_cost(self):
         return self.annotate(
-            total_cost=Sum(F('order_items__quantity') * F('order_items__fixed_price'))
+            calculated_total_cost=Sum(F('order_items__quantity') * F('order_items__fixed_price'))
+        )
+
+    def with_available_restaurants(self):
+        orders = list(self.prefetch_related('order_items'))
+
+        restaurants = Restaurant.objects.in_bulk()
+        masks = restaurant_capabilities.get_masks()
+        for order in orders:
+            order_product_ids = {item.product_id for item in order.order_items.all()}
+            order.capable_restaurants = [
+                restaurants[restaurant_id]
+                for restaurant_id in restaurant_capabilities.find_restaurant_ids(order_product_ids, masks)
+                if restaurant_id in restaurants
+            ]
+        return orders
+
+
+class RestaurantQuerySet(models.QuerySet):
+    def within_bounding_box(self, lat, lon, radius):
+        min_lat, max_lat, min_lon, max_lon = get_bounding_box(lat, lon, radius)
+        return self.filter(
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lon, max_lon)
         )
 
 
@@ -31,14 +60,44 @@ class Restaurant(models.Model):
     )
     latitude = models.FloatField('широта', null=True, blank=True)
     longitude = models.FloatField('долгота', null=True, blank=True)
+    max_active_orders = models.PositiveIntegerField(
+        'максимум заказов в работе',
+        null=True,
+        blank=True,
+        help_text='Для автоматического распределения заказов. Пусто — без ограничений'
+    )
+    delivery_radius = models.FloatField(
+        'радиус доставки, км',
+        null=True,
+        blank=True,
+        default=10,
+        validators=[MinValueValidator(0)],
+        help_text='Пусто — без ограничений'
+    )
+
+    objects = RestaurantQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'ресторан'
         verbose_name_plural = 'рестораны'
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+        ]
 
     def __str__(self):
         return self.name
 
+    def get_distance(self, lat, lon):
+        if None in (self.latitude, self.longitude, lat, lon):
+            return None
+        return calculate_distance(self.latitude, self.longitude, lat, lon)
+
+    def delivers_to(self, lat, lon):
+        distance = self.get_distance(lat, lon)
+        if distance is None or self.delivery_radius is None:
+            return True
+        return distance <= self.delivery_radius
+
 
 class ProductQuerySet(models.QuerySet):
     def available(self):
@@ -192,6 +251,11 @@ class Order(models.Model):
         blank=True,
         verbose_name='Дата создания заказа'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения заказа'
+    )
     called_at = models.DateTimeField(
         db_index=True,
         verbose_name='Дата звонка',
@@ -214,25 +278,85 @@ class Order(models.Model):
     )
     address_lon = models.FloatField('Долгота адреса', null=True, blank=True)
     address_lat = models.FloatField('Широта адреса', null=True, blank=True)
+    total_cost = models.DecimalField(
+        'Стоимость заказа',
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
+
+    def get_product_ids(self):
+        if 'order_items' in getattr(self, '_prefetched_objects_cache', {}):
+            return {item.product_id for item in self.order_items.all()}
+        return set(self.order_items.values_list('product_id', flat=True))
 
     def get_available_restaurants(self):
-        order_product_ids = set(self.products.values_list('id', flat=True))
+        restaurant_ids = restaurant_capabilities.find_restaurant_ids(self.get_product_ids())
+        return Restaurant.objects.filter(id__in=restaurant_ids)
 
-        return Restaurant.objects.filter(
-            menu_items__product__in=order_product_ids,
-            menu_items__availability=True
-        ).annotate(
-            num_products=Count('menu_items__product')
-        ).filter(
-            num_products=len(order_product_ids)
-        ).distinct()
+    def get_deliverable_restaurants(self):
+        restaurants = self.get_available_restaurants()
+        if self.address_lat is None or self.address_lon is None:
+            return restaurants.order_by('name')
+
+        max_radius = restaurants.aggregate(max_radius=Max('delivery_radius'))['max_radius'] or 0
+        nearby_restaurants = restaurants.within_bounding_box(
+            self.address_lat, self.address_lon, max_radius
+        )
+        unrestricted_restaurants = restaurants.filter(
+            Q(delivery_radius__isnull=True)
+            | Q(latitude__isnull=True)
+            | Q(longitude__isnull=True)
+        )
+        distances = {
+            restaurant.id: restaurant.get_distance(self.address_lat, self.address_lon)
+            for restaurant in nearby_restaurants | unrestricted_restaurants
+            if restaurant.delivers_to(self.address_lat, self.address_lon)
+        }
+        restaurant_ids = sorted(
+            distances,
+            key=lambda restaurant_id: (distances[restaurant_id] is None, distances[restaurant_id])
+        )
+        return Restaurant.objects.filter(id__in=restaurant_ids).order_by(Case(
+            *[When(id=restaurant_id, then=position) for position, restaurant_id in enumerate(restaurant_ids)],
+            default=len(restaurant_ids)
+        ))
 
     def assign_restaurant(self, restaurant):
-        if restaurant not in self.get_available_restaurants():
+        if not can_prepare(self, restaurant):
             raise ValueError("Этот ресторан не может приготовить заказ!")
+        updated_at = timezone.now()
+        with transaction.atomic():
+            assigned = Order.objects.filter(
+                pk=self.pk,
+                order_status='MANAGER',
+                restaurant__isnull=True,
+            ).update(
+                restaurant=restaurant,
+                order_status='RESTAURANT',
+                updated_at=updated_at,
+            )
+            if not assigned:
+                return False
+            OrderEvent.objects.create(order=self, kind='STATUS_CHANGED', order_status='RESTAURANT')
         self.restaurant = restaurant
         self.order_status = 'RESTAURANT'
-        self.save()
+        self.updated_at = updated_at
+        self._saved_order_status = self.order_status
+        return True
+
+    def update_total_cost(self):
+        total_cost = self.order_items.aggregate(
+            total_cost=Sum(F('quantity') * F('fixed_price'))
+        )['total_cost'] or 0
+        updated_at = timezone.now()
+        Order.objects.filter(pk=self.pk).update(
+            total_cost=total_cost,
+            updated_at=updated_at
+        )
+        self.total_cost = total_cost
+        self.updated_at = updated_at
 
     class Meta:
         verbose_name = 'заказ'
@@ -279,3 +403,87 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f'{self.product.name} x{self.quantity}'
+
+
+class GeocodingJobQuerySet(models.QuerySet):
+    def due(self):
+        return self.filter(
+            run_after__lte=timezone.now(),
+            attempts__lt=GeocodingJob.MAX_ATTEMPTS,
+        )
+
+
+class GeocodingJob(models.Model):
+    MAX_ATTEMPTS = 8
+    RETRY_DELAY = timedelta(seconds=30)
+    MAX_RETRY_DELAY = timedelta(hours=1)
+
+    order = models.OneToOneField(
+        Order,
+        related_name='geocoding_job',
+        verbose_name='Заказ',
+        on_delete=models.CASCADE
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    run_after = models.DateTimeField(
+        'Выполнить после',
+        default=timezone.now,
+        db_index=True
+    )
+    last_error = models.TextField('Последняя ошибка', default='', blank=True)
+
+    objects = GeocodingJobQuerySet.as_manager()
+
+    def schedule_retry(self, error):
+        self.attempts += 1
+        delay = min(self.RETRY_DELAY * 2 ** (self.attempts - 1), self.MAX_RETRY_DELAY)
+        self.run_after = timezone.now() + delay
+        self.last_error = str(error)
+        self.save(update_fields=['attempts', 'run_after', 'last_error'])
+
+    class Meta:
+        verbose_name = 'задача геокодирования'
+        verbose_name_plural = 'задачи геокодирования'
+
+    def __str__(self):
+        return f'Геокодирование: {self.order}'
+
+
+class OrderEventQuerySet(models.QuerySet):
+    def expired(self):
+        return self.filter(created_at__lt=timezone.now() - OrderEvent.TTL)
+
+
+class OrderEvent(models.Model):
+    KIND = (
+        ('CREATED', 'Создан'),
+        ('STATUS_CHANGED', 'Изменён статус'),
+    )
+    TTL = timedelta(days=1)
+
+    order = models.ForeignKey(
+        Order,
+        related_name='events',
+        verbose_name='Заказ',
+        on_delete=models.CASCADE
+    )
+    kind = models.CharField('Событие', max_length=20, choices=KIND)
+    order_status = models.CharField(
+        'Статус заказа',
+        max_length=50,
+        choices=Order.STATUS
+    )
+    created_at = models.DateTimeField(
+        'Дата события',
+        default=timezone.now,
+        db_index=True
+    )
+
+    objects = OrderEventQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'событие заказа'
+        verbose_name_plural = 'события заказов'
+
+    def __str__(self):
+        return f'{self.order}: {self.get_kind_display()}'
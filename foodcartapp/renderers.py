@@ -0,0 +1,47 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_default(obj):
+    return DjangoJSONEncoder().default(obj)
+
+
+def dumps(data):
+    if orjson:
+        option = orjson.OPT_INDENT_2 if settings.DEBUG else 0
+        return orjson.dumps(data, default=encode_default, option=option)
+
+    if settings.DEBUG:
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, indent=4).encode()
+    return json.dumps(
+        data,
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode()
+
+
+class FastJSONResponse(HttpResponse):
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class FastJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
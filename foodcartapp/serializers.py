@@ -1,10 +1,26 @@
 from rest_framework import serializers
 from phonenumber_field.serializerfields import PhoneNumberField 
+from .catalogue import PRODUCT_FIELDS
 from .models import Product, Order, OrderItem
 
 
+class ProductListQuerySerializer(serializers.Serializer):
+    category = serializers.IntegerField(required=False)
+    special_status = serializers.BooleanField(required=False)
+    cursor = serializers.IntegerField(required=False, min_value=0)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=100)
+    fields = serializers.CharField(required=False)
+
+    def validate_fields(self, fields):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown_fields = sorted(set(fields) - set(PRODUCT_FIELDS))
+        if unknown_fields:
+            raise serializers.ValidationError(f'Неизвестные поля: {unknown_fields}')
+        return fields
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
-    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+    product = serializers.IntegerField()
     quantity = serializers.IntegerField(min_value=1)
 
     class Meta:
@@ -24,21 +40,43 @@ class OrderSerializer(serializers.ModelSerializer):
             'lastname': {'source': 'last_name'},
         }
 
+    def validate_products(self, products_data):
+        product_ids = {product_data['product'] for product_data in products_data}
+        products = Product.objects.in_bulk(product_ids)
+
+        unknown_ids = sorted(product_ids - products.keys())
+        if unknown_ids:
+            raise serializers.ValidationError(
+                f'Недопустимые первичные ключи товаров: {unknown_ids}'
+            )
+
+        for product_data in products_data:
+            product_data['product'] = products[product_data['product']]
+        return products_data
+
     def create(self, validated_data):
         products_data = validated_data.pop('products')
+        total_cost = sum(
+            product_data['product'].price * product_data['quantity']
+            for product_data in products_data
+        )
         order = Order.objects.create(
             first_name=validated_data['first_name'],
             last_name=validated_data.get('last_name', ''),
             phonenumber=validated_data['phonenumber'],
-            address=validated_data['address']
+            address=validated_data['address'],
+            total_cost=total_cost
         )
 
-        for product_data in products_data:
-            OrderItem.objects.create(
+        OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
                 product=product_data['product'],
-                quantity=product_data['quantity']
+                quantity=product_data['quantity'],
+                fixed_price=product_data['product'].price
             )
+            for product_data in products_data
+        ])
 
         return order
 
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .capabilities import restaurant_capabilities
+from .catalogue import invalidate_catalogue
+from .locations import restaurant_locations
+from .models import Order, OrderEvent, OrderItem, Product, ProductCategory, Restaurant, RestaurantMenuItem
+
+
+def invalidate_catalogue_on_commit(**kwargs):
+    transaction.on_commit(invalidate_catalogue)
+
+
+for model in (Product, ProductCategory, RestaurantMenuItem):
+    post_save.connect(
+        invalidate_catalogue_on_commit,
+        sender=model,
+        dispatch_uid=f'catalogue_save_{model.__name__}',
+    )
+    post_delete.connect(
+        invalidate_catalogue_on_commit,
+        sender=model,
+        dispatch_uid=f'catalogue_delete_{model.__name__}',
+    )
+
+
+def update_order_total_cost(instance, origin=None, **kwargs):
+    if isinstance(origin, Order) or getattr(origin, 'model', None) is Order:
+        return
+    instance.order.update_total_cost()
+
+
+post_save.connect(update_order_total_cost, sender=OrderItem, dispatch_uid='order_total_cost_save')
+post_delete.connect(update_order_total_cost, sender=OrderItem, dispatch_uid='order_total_cost_delete')
+
+
+def remember_order_status(instance, **kwargs):
+    if 'order_status' not in instance.get_deferred_fields():
+        instance._saved_order_status = instance.order_status
+
+
+def record_order_event(instance, created, update_fields=None, **kwargs):
+    if created:
+        kind = 'CREATED'
+    elif update_fields is not None and 'order_status' not in update_fields:
+        return
+    elif instance.order_status != getattr(instance, '_saved_order_status', instance.order_status):
+        kind = 'STATUS_CHANGED'
+    else:
+        return
+
+    OrderEvent.objects.create(order=instance, kind=kind, order_status=instance.order_status)
+    instance._saved_order_status = instance.order_status
+
+
+post_init.connect(remember_order_status, sender=Order, dispatch_uid='order_remember_status')
+post_save.connect(record_order_event, sender=Order, dispatch_uid='order_record_event')
+
+
+def remember_menu_item(instance, **kwargs):
+    if not instance.get_deferred_fields():
+        instance._saved_menu_item = (instance.restaurant_id, instance.product_id)
+
+
+def update_capabilities_on_save(instance, **kwargs):
+    saved_menu_item = getattr(instance, '_saved_menu_item', None)
+    menu_item = (instance.restaurant_id, instance.product_id)
+    availability = instance.availability
+
+    def update_capabilities():
+        if saved_menu_item and saved_menu_item[0] and saved_menu_item != menu_item:
+            restaurant_capabilities.update_menu_item(*saved_menu_item, False)
+        restaurant_capabilities.update_menu_item(*menu_item, availability)
+
+    transaction.on_commit(update_capabilities)
+    instance._saved_menu_item = menu_item
+
+
+def update_capabilities_on_delete(instance, **kwargs):
+    menu_item = (instance.restaurant_id, instance.product_id)
+    transaction.on_commit(
+        lambda: restaurant_capabilities.update_menu_item(*menu_item, False)
+    )
+
+
+post_init.connect(remember_menu_item, sender=RestaurantMenuItem, dispatch_uid='menu_item_remember')
+post_save.connect(update_capabilities_on_save, sender=RestaurantMenuItem, dispatch_uid='capabilities_save')
+post_delete.connect(update_capabilities_on_delete, sender=RestaurantMenuItem, dispatch_uid='capabilities_delete')
+
+
+def invalidate_restaurant_locations(**kwargs):
+    transaction.on_commit(restaurant_locations.invalidate)
+
+
+post_save.connect(invalidate_restaurant_locations, sender=Restaurant, dispatch_uid='locations_save')
+post_delete.connect(invalidate_restaurant_locations, sender=Restaurant, dispatch_uid='locations_delete')
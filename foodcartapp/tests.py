@@ -0,0 +1,296 @@
+import json
+import os
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .catalogue import get_catalogue
+from .locations import rank_restaurants, restaurant_locations
+from .models import Order, OrderItem, Product, ProductCategory, Restaurant, RestaurantMenuItem
+
+
+RESTAURANTS_COUNT = 200
+PRODUCTS_COUNT = 2000
+MENU_ITEMS_PER_RESTAURANT = 100
+ORDERS_COUNT = 2000
+ITEMS_PER_ORDER = 3
+# Per-view budgets are about twice the time measured on the seeded data, set
+# PERFORMANCE_TEST_MAX_SECONDS to use one budget for every view on a slower machine
+MAX_SECONDS_OVERRIDE = os.environ.get('PERFORMANCE_TEST_MAX_SECONDS')
+DEFAULT_MAX_SECONDS = 0.5
+
+
+def seed_data():
+    rnd = random.Random(42)
+    categories = ProductCategory.objects.bulk_create([
+        ProductCategory(name=f'Категория {number}') for number in range(10)
+    ])
+    products = Product.objects.bulk_create([
+        Product(
+            name=f'Товар {number}',
+            category=categories[number % len(categories)],
+            price=Decimal(100 + number % 500),
+            image='burger.jpg',
+            special_status=number % 10 == 0,
+        )
+        for number in range(PRODUCTS_COUNT)
+    ])
+    restaurants = Restaurant.objects.bulk_create([
+        Restaurant(
+            name=f'Ресторан {number}',
+            address=f'Москва, улица {number}',
+            latitude=55.5 + rnd.random() * 0.5,
+            longitude=37.3 + rnd.random() * 0.6,
+        )
+        for number in range(RESTAURANTS_COUNT)
+    ])
+    popular_products = products[:MENU_ITEMS_PER_RESTAURANT // 2]
+    RestaurantMenuItem.objects.bulk_create([
+        RestaurantMenuItem(restaurant=restaurant, product=product)
+        for restaurant in restaurants
+        for product in {
+            *popular_products,
+            *rnd.sample(products, MENU_ITEMS_PER_RESTAURANT // 2),
+        }
+    ])
+    orders = Order.objects.bulk_create([
+        Order(
+            first_name=f'Клиент {number}',
+            phonenumber='+79261234567',
+            address=f'Москва, проспект {number}',
+            address_lat=55.5 + rnd.random() * 0.5,
+            address_lon=37.3 + rnd.random() * 0.6,
+            order_status=rnd.choice(['MANAGER', 'RESTAURANT', 'COMPLETED']),
+        )
+        for number in range(ORDERS_COUNT)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=1, fixed_price=product.price)
+        for order in orders
+        for product in rnd.sample(popular_products, ITEMS_PER_ORDER)
+    ])
+    return User.objects.create_superuser('manager', 'manager@example.com', 'password')
+
+
+class ViewPerformanceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = seed_data()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.manager)
+
+    def assertFast(self, max_queries, *args, max_seconds=DEFAULT_MAX_SECONDS, method='get', **kwargs):
+        if MAX_SECONDS_OVERRIDE:
+            max_seconds = float(MAX_SECONDS_OVERRIDE)
+        started_at = time.perf_counter()
+        with QueriesAtMost(self, max_queries):
+            response = getattr(self.client, method)(*args, **kwargs)
+        self.assertLess(time.perf_counter() - started_at, max_seconds)
+        return response
+
+
+class QueriesAtMost:
+    def __init__(self, test_case, max_queries):
+        self.test_case = test_case
+        self.max_queries = max_queries
+        self.context = CaptureQueriesContext(connection)
+
+    def __enter__(self):
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.test_case.assertLessEqual(
+                len(self.context),
+                self.max_queries,
+                '\n'.join(query['sql'] for query in self.context.captured_queries),
+            )
+
+
+class ProductListApiTest(ViewPerformanceTestCase):
+    def test_full_catalogue(self):
+        response = self.assertFast(2, '/api/products/', max_seconds=4)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.assertFast(0, '/api/products/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_content_encoding(self):
+        for accept_encoding, content_encoding in [
+            ('gzip, deflate', 'gzip'),
+            ('gzip;q=0, identity', None),
+            ('*;q=0.5, gzip;q=0', 'br' if 'br' in get_catalogue()['encoded_content'] else None),
+            ('', None),
+        ]:
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.client.get('/api/products/', HTTP_ACCEPT_ENCODING=accept_encoding)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get('Content-Encoding'), content_encoding)
+
+    def test_catalogue_page(self):
+        response = self.assertFast(1, '/api/products/', {'limit': 50, 'category': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Link', response)
+
+    def test_unknown_params_use_cached_catalogue(self):
+        response = self.assertFast(2, '/api/products/', {'utm_source': 'newsletter'}, max_seconds=4)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+
+    def test_default_page_size(self):
+        response = self.assertFast(1, '/api/products/', {'category': 1})
+        self.assertEqual(len(response.json()), 20)
+        self.assertIn('Link', response)
+
+
+class RegisterOrderTest(ViewPerformanceTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def register_order(self, lines_count):
+        payload = {
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79261234567',
+            'address': 'Москва, Арбат, 1',
+            'products': [
+                {'product': product_id, 'quantity': 1}
+                for product_id in Product.objects.values_list('id', flat=True)[:lines_count]
+            ],
+        }
+        return self.assertFast(
+            8,
+            '/api/order/',
+            json.dumps(payload),
+            method='post',
+            content_type='application/json',
+        )
+
+    def test_query_count_does_not_depend_on_lines(self):
+        for lines_count in (1, 30, 100):
+            with self.subTest(lines_count=lines_count):
+                response = self.register_order(lines_count)
+                self.assertEqual(response.status_code, 200)
+                order = Order.objects.get(pk=response.json()['id'])
+                self.assertEqual(order.order_items.count(), lines_count)
+
+
+class OrderItemFixedPriceTest(TestCase):
+    def test_fixed_price_does_not_follow_product_price(self):
+        category = ProductCategory.objects.create(name='Бургеры')
+        products = Product.objects.bulk_create([
+            Product(name='Чизбургер', category=category, price=Decimal('150.00'), image='burger.jpg'),
+            Product(name='Картофель фри', category=category, price=Decimal('90.00'), image='burger.jpg'),
+        ])
+        payload = {
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79261234567',
+            'address': 'Москва, Арбат, 1',
+            'products': [
+                {'product': products[0].id, 'quantity': 2},
+                {'product': products[1].id, 'quantity': 1},
+            ],
+        }
+        response = self.client.post('/api/order/', json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        Product.objects.filter(pk=products[0].pk).update(price=Decimal('999.00'))
+        order = Order.objects.get(pk=response.json()['id'])
+        self.assertEqual(
+            dict(order.order_items.values_list('product_id', 'fixed_price')),
+            {products[0].id: Decimal('150.00'), products[1].id: Decimal('90.00')},
+        )
+        self.assertEqual(order.total_cost, Decimal('390.00'))
+
+
+class RegisterOrderAsyncTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = ProductCategory.objects.create(name='Бургеры')
+        cls.product = Product.objects.create(
+            name='Чизбургер', category=category, price=Decimal('150.00'), image='burger.jpg'
+        )
+
+    def test_same_errors_as_sync_endpoint(self):
+        valid_payload = {
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79261234567',
+            'address': 'Москва, Арбат, 1',
+            'products': [{'product': self.product.id, 'quantity': 1}],
+        }
+        bodies = [
+            '{"firstname": ',
+            json.dumps({}),
+            json.dumps({**valid_payload, 'phonenumber': '123', 'products': []}),
+            json.dumps({**valid_payload, 'products': [{'product': 0, 'quantity': 1}]}),
+            json.dumps({**valid_payload, 'products': [{'product': self.product.id, 'quantity': 0}]}),
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                sync_response = self.client.post('/api/order/', body, content_type='application/json')
+                async_response = self.client.post('/api/order/async/', body, content_type='application/json')
+                self.assertEqual(sync_response.status_code, 400)
+                self.assertEqual(async_response.status_code, sync_response.status_code)
+                self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_only_post_allowed(self):
+        response = self.client.get('/api/order/async/')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'POST')
+
+
+class OrderAdminTest(ViewPerformanceTestCase):
+    def test_changelist(self):
+        response = self.assertFast(12, '/admin/foodcartapp/order/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_change_view(self):
+        order = Order.objects.exclude(order_status='COMPLETED').first()
+        response = self.assertFast(14, f'/admin/foodcartapp/order/{order.id}/change/', max_seconds=3)
+        self.assertEqual(response.status_code, 200)
+
+
+class RankRestaurantsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.far_restaurant = Restaurant.objects.create(name='Далеко', latitude=55.8, longitude=37.7)
+        self.moved_restaurant = Restaurant.objects.create(name='Переехал', latitude=55.95, longitude=37.95)
+        self.new_restaurant = Restaurant.objects.create(name='Новый')
+        self.order = Order(address_lat=55.75, address_lon=37.62)
+
+    def test_restaurants_missing_from_stale_index(self):
+        restaurant_locations.get_index()
+        # geocode_all in another process does not invalidate this process's index
+        Restaurant.objects.filter(pk=self.new_restaurant.pk).update(latitude=55.751, longitude=37.621)
+        Restaurant.objects.filter(pk=self.moved_restaurant.pk).update(latitude=55.76, longitude=37.63)
+
+        restaurants = list(Restaurant.objects.all())
+        for k, expected_restaurants in [
+            (None, [self.new_restaurant, self.moved_restaurant, self.far_restaurant]),
+            (1, [self.new_restaurant]),
+            (2, [self.new_restaurant, self.moved_restaurant]),
+        ]:
+            with self.subTest(k=k):
+                ranked_restaurants = rank_restaurants(self.order, restaurants, k=k)
+                self.assertEqual([restaurant for restaurant, _ in ranked_restaurants], expected_restaurants)
+
+    def test_nearest_restaurant_within_its_delivery_radius(self):
+        Restaurant.objects.filter(pk=self.new_restaurant.pk).update(latitude=55.79, longitude=37.66)
+        Restaurant.objects.filter(pk=self.moved_restaurant.pk).update(delivery_radius=1)
+        restaurants = list(Restaurant.objects.all())
+        self.assertEqual(
+            [restaurant for restaurant, _ in rank_restaurants(self.order, restaurants, k=1)],
+            [self.new_restaurant],
+        )
@@ -1,21 +1,36 @@
-from django.http import JsonResponse
+import io
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed
 from django.templatetags.static import static
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.db import transaction
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 
 from rest_framework.decorators import api_view
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.views import exception_handler
 
-from .models import Product
+from .catalogue import PAGE_QUERY_PARAMS, get_catalogue, get_catalogue_page
+from .geocoding import geocode_new_order
 from .models import Order
 from .models import OrderItem
+from .models import GeocodingJob
 
+from .renderers import FastJSONResponse
 from .serializers import OrderItemSerializer, OrderSerializer, OrderResponseSerializer
+from .serializers import ProductListQuerySerializer
 
 
 def banners_list_api(request):
     # FIXME move data to db?
-    return JsonResponse([
+    return FastJSONResponse([
         {
             'title': 'Burger',
             'src': static('burger.jpg'),
@@ -31,50 +46,99 @@ def banners_list_api(request):
             'src': static('tasty.jpg'),
             'text': 'Food is incomplete without a tasty dessert',
         }
-    ], safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    ])
+
+
+def get_request_catalogue(request):
+    if not hasattr(request, 'catalogue'):
+        request.catalogue = get_catalogue()
+    return request.catalogue
+
+
+def parse_accept_encoding(accept_encoding):
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, *params = part.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+        qualities[coding] = quality
+    return qualities
+
+
+def get_accepted_encoding(request):
+    qualities = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    encoded_content = get_request_catalogue(request)['encoded_content']
+    accepted_encodings = [
+        (qualities.get(encoding, qualities.get('*', 0)), encoding)
+        for encoding in ('br', 'gzip')
+        if encoding in encoded_content
+    ]
+    quality, encoding = max(accepted_encodings, key=lambda item: item[0], default=(0, None))
+    return encoding if quality > 0 else None
+
+
+def get_catalogue_etag(request):
+    etag = get_request_catalogue(request)['etag']
+    encoding = get_accepted_encoding(request)
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+def get_catalogue_last_modified(request):
+    return get_request_catalogue(request)['last_modified']
+
+
+def filtered_product_list_api(request):
+    query_serializer = ProductListQuerySerializer(data=request.GET.dict())
+    if not query_serializer.is_valid():
+        return FastJSONResponse(query_serializer.errors, status=400)
+
+    products, next_cursor = get_catalogue_page(**query_serializer.validated_data)
+    response = FastJSONResponse(products)
+    if next_cursor is not None:
+        query = request.GET.copy()
+        query['cursor'] = next_cursor
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+        response['Link'] = f'<{next_url}>; rel="next"'
+    return response
+
+
+@vary_on_headers('Accept-Encoding')
+@cache_control(no_cache=True)
+@condition(etag_func=get_catalogue_etag, last_modified_func=get_catalogue_last_modified)
+def full_product_list_api(request):
+    catalogue = get_request_catalogue(request)
+    encoding = get_accepted_encoding(request)
+    if not encoding:
+        return HttpResponse(catalogue['content'], content_type='application/json')
+
+    response = HttpResponse(catalogue['encoded_content'][encoding], content_type='application/json')
+    response['Content-Encoding'] = encoding
+    return response
 
 
 def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-
-    dumped_products = []
-    for product in products:
-        dumped_product = {
-            'id': product.id,
-            'name': product.name,
-            'price': product.price,
-            'special_status': product.special_status,
-            'description': product.description,
-            'category': {
-                'id': product.category.id,
-                'name': product.category.name,
-            } if product.category else None,
-            'image': product.image.url,
-            'restaurant': {
-                'id': product.id,
-                'name': product.name,
-            }
-        }
-        dumped_products.append(dumped_product)
-    return JsonResponse(dumped_products, safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    if PAGE_QUERY_PARAMS.intersection(request.GET):
+        return filtered_product_list_api(request)
+    return full_product_list_api(request)
 
 
-def fetch_and_save_coordinates(instance):
-    try:
-        from geocoder import fetch_coordinates 
-        lon, lat = fetch_coordinates(instance.address)
-        instance.address_lon = lon
-        instance.address_lat = lat
-    except Exception as e:
-        instance.address_lon = None
-        instance.address_lat = None
-    instance.save()
+def create_order(serializer, geocode_after=None):
+    with transaction.atomic():
+        order = serializer.save()
+        job = GeocodingJob.objects.create(
+            order=order,
+            run_after=timezone.now() + (geocode_after or timedelta()),
+        )
+    return order, job
 
 
 @api_view(['GET', 'POST'])
@@ -82,8 +146,28 @@ def register_order(request):
     serializer = OrderSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    with transaction.atomic():
-        order = serializer.save()
-        fetch_and_save_coordinates(order)
-        response_serializer = OrderResponseSerializer(order)
-        return Response(response_serializer.data)
+    order, _ = create_order(serializer)
+    response_serializer = OrderResponseSerializer(order)
+    return Response(response_serializer.data)
+
+
+def get_error_response(error):
+    response = exception_handler(error, {})
+    return FastJSONResponse(response.data, status=response.status_code)
+
+
+async def register_order_async(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        serializer = OrderSerializer(data=JSONParser().parse(io.BytesIO(request.body)))
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+    except APIException as error:
+        return get_error_response(error)
+
+    order, job = await sync_to_async(create_order)(serializer, GeocodingJob.RETRY_DELAY)
+    await geocode_new_order(job)
+    return FastJSONResponse(OrderResponseSerializer(order).data)
+
+
+register_order_async.csrf_exempt = True
@@ -1,3 +1,35 @@
-from django.test import TestCase
+from foodcartapp.models import Order
+from foodcartapp.tests import ViewPerformanceTestCase
 
-# Create your tests here.
+
+class ManagerViewsTest(ViewPerformanceTestCase):
+    def test_products(self):
+        response = self.assertFast(5, '/manager/products/', max_seconds=6)
+        self.assertEqual(response.status_code, 200)
+
+    def test_restaurants(self):
+        response = self.assertFast(3, '/manager/restaurants/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_orders(self):
+        response = self.assertFast(10, '/manager/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['order_items']), 50)
+
+    def test_filtered_orders(self):
+        response = self.assertFast(10, '/manager/orders/', {'order_status': 'RESTAURANT', 'page': 2})
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_changes(self):
+        order = Order.objects.exclude(order_status='COMPLETED').first()
+        response = self.assertFast(
+            10,
+            '/manager/orders/changes/',
+            {'since': order.updated_at.isoformat()},
+            max_seconds=3,
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_changes_with_invalid_since(self):
+        response = self.client.get('/manager/orders/changes/', {'since': '2026-13-40T00:00:00'})
+        self.assertEqual(response.status_code, 400)
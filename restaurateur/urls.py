@@ -14,6 +14,9 @@ urlpatterns = [
 
     # TODO заглушка для нереализованного функционала
     path('orders/', views.view_orders, name="view_orders"),
+    path('orders/changes/', views.view_order_changes, name="view_order_changes"),
+    path('orders/events/', views.view_order_events, name="view_order_events"),
+    path('metrics/', views.view_metrics, name="view_metrics"),
 
     path('login/', views.LoginView.as_view(), name="login"),
     path('logout/', views.LogoutView.as_view(), name="logout"),
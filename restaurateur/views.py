@@ -1,5 +1,18 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+
 from django import forms
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.views import View
 from django.urls import reverse_lazy
 from django.contrib.auth.decorators import user_passes_test
@@ -8,56 +21,9 @@ from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
 
 
-from foodcartapp.models import Product, Restaurant, Order
-from coordinates.models import AddressCoordinates
-
-from geopy.distance import distance
-import requests
-from dotenv import load_dotenv
-import os
-
-
-def calculate_distance(restaurant_lat, restaurant_lon, order_lat, order_lon):
-    if None in (restaurant_lat, restaurant_lon, order_lat, order_lon):
-        None
-    else:
-        return distance((restaurant_lat, restaurant_lon), (order_lat, order_lon)).km
-
-
-def fetch_coordinates(address):
-    try:
-        coord = AddressCoordinates.objects.get(address=address)
-        return coord.lon, coord.lat
-    except AddressCoordinates.DoesNotExist:
-        pass
-
-    try:
-        load_dotenv()
-        base_url = "https://geocode-maps.yandex.ru/1.x"
-        apikey = os.getenv('YANDEX_API')
-        response = requests.get(base_url, params={
-            "geocode": address,
-            "apikey": apikey,
-            "format": "json",
-        })
-        response.raise_for_status()
-        found_places = response.json()['response']['GeoObjectCollection']['featureMember']
-
-        if not found_places:
-            AddressCoordinates.objects.create(address=address)
-            return None
-
-        most_relevant = found_places[0]
-        lon, lat = most_relevant['GeoObject']['Point']['pos'].split(" ")
-
-        AddressCoordinates.objects.create(
-            address=address,
-            lat=lat,
-            lon=lon
-        )
-        return lon, lat
-    except Exception as e:
-        return None
+from foodcartapp.locations import rank_restaurants
+from foodcartapp.models import Product, Restaurant, Order, OrderEvent
+from star_burger.metrics import request_metrics
 
 
 class Login(forms.Form):
@@ -115,7 +81,7 @@ def is_manager(user):
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_products(request):
     restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
+    products = list(Product.objects.select_related('category').prefetch_related('menu_items'))
 
     products_with_restaurant_availability = []
     for product in products:
@@ -139,37 +105,200 @@ def view_restaurants(request):
     })
 
 
+class OrderFilterForm(forms.Form):
+    order_status = forms.ChoiceField(
+        label='Статус',
+        required=False,
+        choices=[('', 'Все необработанные'), *Order.STATUS],
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    payment_method = forms.ChoiceField(
+        label='Способ оплаты',
+        required=False,
+        choices=[('', 'Любой'), *Order.PAYMENT],
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    created_from = forms.DateField(
+        label='Создан с',
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    created_to = forms.DateField(
+        label='Создан по',
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+
+    def filter_orders(self, orders):
+        filters = self.cleaned_data
+        if filters.get('order_status'):
+            orders = orders.filter(order_status=filters['order_status'])
+        else:
+            orders = orders.exclude(order_status='COMPLETED')
+        if filters.get('payment_method'):
+            orders = orders.filter(payment_method=filters['payment_method'])
+        if filters.get('created_from'):
+            orders = orders.filter(created_at__date__gte=filters['created_from'])
+        if filters.get('created_to'):
+            orders = orders.filter(created_at__date__lte=filters['created_to'])
+        return orders
+
+
+ORDERS_PER_PAGE = 50
+ORDER_CHANGES_OVERLAP = timedelta(seconds=5)
+
+
+def get_board_orders(orders):
+    orders = orders.select_related('restaurant').with_available_restaurants()
+    for order in orders:
+        ranked_restaurants = rank_restaurants(
+            order,
+            order.capable_restaurants,
+            k=settings.BOARD_NEAREST_RESTAURANTS
+        )
+        order.available_restaurants = [
+            {'name': restaurant.name, 'distance': distance}
+            for restaurant, distance in ranked_restaurants
+        ]
+    return orders
+
+
+def get_filter_form(request):
+    form = OrderFilterForm(request.GET)
+    form.is_valid()
+    return form
+
+
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_orders(request):
-    orders = Order.objects.with_total_cost().prefetch_related('order_items')
-    active_orders = orders.exclude(order_status='COMPLETED')
-
-    for order in active_orders:
-        order_lon = order.address_lon
-        order_lat = order.address_lat
-        available_restaurants = []
-
-        for restaurant in order.get_available_restaurants():
-            restaurant_lon = restaurant.longitude
-            restaurant_lat = restaurant.latitude
-
-            dist = calculate_distance(
-                restaurant_lon, restaurant_lat,
-                order_lon, order_lat
-            ) if all((restaurant_lat, restaurant_lon, order_lat, order_lon)) else None
-
-            available_restaurants.append({
-                'name': restaurant.name,
-                'distance': dist
-            })
-
-        order.available_restaurants = sorted(
-            available_restaurants,
-            key=lambda x: x['distance'] if x['distance'] is not None else float('inf')
-        )
+    filter_form = get_filter_form(request)
+    orders = filter_form.filter_orders(Order.objects.order_by('id'))
+    page = Paginator(orders, ORDERS_PER_PAGE).get_page(request.GET.get('page'))
+
+    query = request.GET.copy()
+    query.pop('page', None)
 
     return render(
         request,
         template_name='order_items.html',
-        context={'order_items': active_orders},
+        context={
+            'order_items': get_board_orders(page.object_list),
+            'page': page,
+            'filter_form': filter_form,
+            'filter_query': query.urlencode(),
+            'changes_since': timezone.now().isoformat(),
+        },
     )
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_order_changes(request):
+    try:
+        since = parse_datetime(request.GET.get('since', ''))
+    except ValueError:
+        since = None
+    if not since:
+        return JsonResponse({'error': 'Укажите время в параметре since'}, status=400)
+
+    now = timezone.now()
+    changed_orders = Order.objects.filter(updated_at__gte=since - ORDER_CHANGES_OVERLAP)
+    filter_form = get_filter_form(request)
+    orders = get_board_orders(filter_form.filter_orders(changed_orders).order_by('id'))
+
+    shown_ids = {order.id for order in orders}
+    removed_ids = [
+        order_id
+        for order_id in changed_orders.values_list('id', flat=True)
+        if order_id not in shown_ids
+    ]
+    return JsonResponse({
+        'since': now.isoformat(),
+        'orders': [
+            {
+                'id': order.id,
+                'html': render_to_string('order_row.html', {'order': order}, request=request),
+            }
+            for order in orders
+        ],
+        'removed': removed_ids,
+    })
+
+
+ORDER_EVENTS_POLL_INTERVAL = 1
+ORDER_EVENTS_HEARTBEAT_INTERVAL = 15
+ORDER_EVENTS_STREAM_DURATION = 5 * 60
+
+
+def get_new_order_events(last_event_id):
+    return OrderEvent.objects.filter(id__gt=last_event_id).order_by('id')[:100]
+
+
+def format_order_event(event):
+    data = json.dumps({
+        'order': event.order_id,
+        'kind': event.kind,
+        'order_status': event.order_status,
+    })
+    return f'id: {event.id}\nevent: order\ndata: {data}\n\n'
+
+
+def stream_order_events(last_event_id):
+    started_at = time.monotonic()
+    last_sent_at = started_at
+    yield 'retry: 3000\n\n'
+
+    while time.monotonic() - started_at < ORDER_EVENTS_STREAM_DURATION:
+        events = list(get_new_order_events(last_event_id))
+        for event in events:
+            yield format_order_event(event)
+            last_event_id = event.id
+            last_sent_at = time.monotonic()
+
+        if not events:
+            if time.monotonic() - last_sent_at > ORDER_EVENTS_HEARTBEAT_INTERVAL:
+                yield ': heartbeat\n\n'
+                last_sent_at = time.monotonic()
+            time.sleep(ORDER_EVENTS_POLL_INTERVAL)
+
+
+async def astream_order_events(last_event_id):
+    started_at = time.monotonic()
+    last_sent_at = started_at
+    yield 'retry: 3000\n\n'
+
+    while time.monotonic() - started_at < ORDER_EVENTS_STREAM_DURATION:
+        events = [event async for event in get_new_order_events(last_event_id)]
+        for event in events:
+            yield format_order_event(event)
+            last_event_id = event.id
+            last_sent_at = time.monotonic()
+
+        if not events:
+            if time.monotonic() - last_sent_at > ORDER_EVENTS_HEARTBEAT_INTERVAL:
+                yield ': heartbeat\n\n'
+                last_sent_at = time.monotonic()
+            await asyncio.sleep(ORDER_EVENTS_POLL_INTERVAL)
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_order_events(request):
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    if last_event_id and last_event_id.isdigit():
+        last_event_id = int(last_event_id)
+    else:
+        last_event_id = OrderEvent.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+
+    # Under ASGI Django would read a sync generator to the end before sending anything
+    if isinstance(request, ASGIRequest):
+        events = astream_order_events(last_event_id)
+    else:
+        events = stream_order_events(last_event_id)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_metrics(request):
+    return JsonResponse(request_metrics.get_snapshot(), json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,17 @@
+"""
+ASGI config for Django project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "star_burger.settings")
+# Under ASGI every request runs its ORM calls in a new thread, so persistent
+# connections would never be reused or closed
+os.environ["DB_CONN_MAX_AGE"] = "0"
+application = get_asgi_application()
@@ -0,0 +1,161 @@
+import contextvars
+import copy
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+
+DURATION_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+PROCESSES_CACHE_KEY = 'request_metrics:processes'
+SNAPSHOT_CACHE_KEY = 'request_metrics:{}'
+SNAPSHOT_TIMEOUT = 60 * 60
+FLUSH_INTERVAL = 10
+
+_current_request = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0
+        self.external_time = {}
+
+    def track_query(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - started_at
+
+    def get_total_time(self):
+        return time.perf_counter() - self.started_at
+
+
+@contextmanager
+def track_request():
+    timings = RequestTimings()
+    token = _current_request.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_request.reset(token)
+
+
+@contextmanager
+def track_external_call(service):
+    timings = _current_request.get()
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            elapsed = time.perf_counter() - started_at
+            timings.external_time[service] = timings.external_time.get(service, 0) + elapsed
+
+
+def get_bucket(duration_ms):
+    for bucket in DURATION_BUCKETS_MS:
+        if duration_ms <= bucket:
+            return str(bucket)
+    return 'inf'
+
+
+def merge_view_stats(target, stats):
+    target['count'] += stats['count']
+    target['errors'] += stats['errors']
+    target['total_ms'] += stats['total_ms']
+    target['db_ms'] += stats['db_ms']
+    target['db_queries'] += stats['db_queries']
+    target['max_db_queries'] = max(target['max_db_queries'], stats['max_db_queries'])
+    for service, elapsed in stats['external_ms'].items():
+        target['external_ms'][service] = target['external_ms'].get(service, 0) + elapsed
+    for bucket, count in stats['histogram'].items():
+        target['histogram'][bucket] = target['histogram'].get(bucket, 0) + count
+
+
+def create_view_stats():
+    return {
+        'count': 0,
+        'errors': 0,
+        'total_ms': 0,
+        'db_ms': 0,
+        'db_queries': 0,
+        'max_db_queries': 0,
+        'external_ms': {},
+        'histogram': {},
+    }
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.pid = None
+        self.process_id = None
+        self.views = {}
+        self.flushed_at = 0
+        self.lock = threading.Lock()
+
+    def reset_after_fork(self):
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.process_id = f'{self.pid}-{uuid.uuid4().hex[:8]}'
+            self.views = {}
+
+    def record(self, view_name, status_code, timings):
+        total_ms = timings.get_total_time() * 1000
+        with self.lock:
+            self.reset_after_fork()
+            stats = self.views.setdefault(view_name, create_view_stats())
+            merge_view_stats(stats, {
+                'count': 1,
+                'errors': int(status_code >= 500),
+                'total_ms': total_ms,
+                'db_ms': timings.db_time * 1000,
+                'db_queries': timings.db_queries,
+                'max_db_queries': timings.db_queries,
+                'external_ms': {
+                    service: elapsed * 1000
+                    for service, elapsed in timings.external_time.items()
+                },
+                'histogram': {get_bucket(total_ms): 1},
+            })
+            should_flush = time.monotonic() - self.flushed_at > FLUSH_INTERVAL
+            if should_flush:
+                self.flushed_at = time.monotonic()
+                snapshot = copy.deepcopy(self.views)
+        if should_flush:
+            self.flush(snapshot)
+
+    def flush(self, snapshot):
+        cache.set(SNAPSHOT_CACHE_KEY.format(self.process_id), snapshot, SNAPSHOT_TIMEOUT)
+        process_ids = cache.get(PROCESSES_CACHE_KEY, [])
+        if self.process_id not in process_ids:
+            cache.set(PROCESSES_CACHE_KEY, [*process_ids, self.process_id], SNAPSHOT_TIMEOUT)
+
+    def get_snapshot(self):
+        with self.lock:
+            self.reset_after_fork()
+            snapshot = copy.deepcopy(self.views)
+            self.flushed_at = time.monotonic()
+        self.flush(snapshot)
+
+        process_ids = cache.get(PROCESSES_CACHE_KEY, [])
+        snapshots = cache.get_many([SNAPSHOT_CACHE_KEY.format(process_id) for process_id in process_ids])
+        views = {}
+        for process_snapshot in snapshots.values():
+            for view_name, stats in process_snapshot.items():
+                merge_view_stats(views.setdefault(view_name, create_view_stats()), stats)
+        cache.set(
+            PROCESSES_CACHE_KEY,
+            [process_id for process_id in process_ids if SNAPSHOT_CACHE_KEY.format(process_id) in snapshots],
+            SNAPSHOT_TIMEOUT,
+        )
+        return {'processes': len(snapshots), 'buckets_ms': DURATION_BUCKETS_MS, 'views': views}
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,91 @@
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from .metrics import request_metrics, track_request
+
+
+logger = logging.getLogger('star_burger.metrics')
+
+
+def get_view_name(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return 'unresolved'
+    return resolver_match.view_name
+
+
+def start_query_tracking(timings):
+    query_tracking = connection.execute_wrapper(timings.track_query)
+    query_tracking.__enter__()
+    return query_tracking
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS:
+            return self.get_response(request)
+
+        with track_request() as timings, connection.execute_wrapper(timings.track_query):
+            response = self.get_response(request)
+        return self.report(request, response, timings)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS:
+            return await self.get_response(request)
+
+        with track_request() as timings:
+            query_tracking = await sync_to_async(start_query_tracking)(timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(query_tracking.__exit__)(None, None, None)
+        return self.report(request, response, timings)
+
+    def report(self, request, response, timings):
+        view_name = get_view_name(request)
+        total_time = timings.get_total_time()
+        request_metrics.record(view_name, response.status_code, timings)
+
+        if settings.REQUEST_METRICS_HEADERS:
+            server_timing = [
+                f'total;dur={total_time * 1000:.1f}',
+                f'db;dur={timings.db_time * 1000:.1f};desc="{timings.db_queries} SQL"',
+            ]
+            server_timing.extend(
+                f'{service};dur={elapsed * 1000:.1f}'
+                for service, elapsed in timings.external_time.items()
+            )
+            response['Server-Timing'] = ', '.join(server_timing)
+            response['X-DB-Query-Count'] = timings.db_queries
+
+        if total_time * 1000 >= settings.REQUEST_METRICS_SLOW_MS:
+            log_level = logging.WARNING
+        else:
+            log_level = logging.INFO
+        logger.log(log_level, json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'status': response.status_code,
+            'total_ms': round(total_time * 1000, 1),
+            'db_queries': timings.db_queries,
+            'db_ms': round(timings.db_time * 1000, 1),
+            'external_ms': {
+                service: round(elapsed * 1000, 1)
+                for service, elapsed in timings.external_time.items()
+            },
+        }, ensure_ascii=False))
+        return response
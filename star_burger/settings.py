@@ -1,5 +1,4 @@
 import os
-import rollbar
 import dj_database_url
 
 from environs import Env
@@ -14,15 +13,27 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 ROLLBAR_ACCESS_TOKEN = env('ROLLBAR_ACCESS_TOKEN', default=None)
 ROLLBAR_ENVIRONMENT = 'production'
 
-if ROLLBAR_ACCESS_TOKEN:
-    rollbar.init(
-        access_token=ROLLBAR_ACCESS_TOKEN,
-        environment=ROLLBAR_ENVIRONMENT,
-        root=BASE_DIR
-    )
+ROLLBAR = {
+    'access_token': ROLLBAR_ACCESS_TOKEN,
+    'environment': ROLLBAR_ENVIRONMENT,
+    'root': BASE_DIR,
+}
+
+YANDEX_API_KEY = env('YANDEX_API', default=None)
+GEOCODER_CACHE_DAYS = env.int('GEOCODER_CACHE_DAYS', 30)
+GEOCODER_NOT_FOUND_CACHE_DAYS = env.int('GEOCODER_NOT_FOUND_CACHE_DAYS', 1)
+GEOCODER_CHECKOUT_TIMEOUT = env.float('GEOCODER_CHECKOUT_TIMEOUT', 3)
+
+AUTO_DISPATCH = env.bool('AUTO_DISPATCH', False)
+BOARD_NEAREST_RESTAURANTS = env.int('BOARD_NEAREST_RESTAURANTS', 5)
+REQUEST_METRICS = env.bool('REQUEST_METRICS', True)
+REQUEST_METRICS_HEADERS = env.bool('REQUEST_METRICS_HEADERS', False)
+REQUEST_METRICS_LOG_LEVEL = env('REQUEST_METRICS_LOG_LEVEL', 'WARNING')
+REQUEST_METRICS_SLOW_MS = env.int('REQUEST_METRICS_SLOW_MS', 1000)
 
 SECRET_KEY = env('SECRET_KEY')
 DEBUG = env.bool('DEBUG', True)
+DEBUG_TOOLBAR = env.bool('DEBUG_TOOLBAR', DEBUG)
 
 ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", subcast=str)
 
@@ -36,12 +47,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'phonenumber_field',
     'rest_framework',
 ]
 
 MIDDLEWARE = [
+    'star_burger.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,9 +60,15 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
+if ROLLBAR_ACCESS_TOKEN:
+    MIDDLEWARE.append('rollbar.contrib.django.middleware.RollbarNotifierMiddlewareExcluding404')
+
 ROOT_URLCONF = 'star_burger.urls'
 
 DEBUG_TOOLBAR_PANELS = [
@@ -93,9 +110,49 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
 DATABASES = {
-    'default': dj_database_url.config(default=os.environ.get('DATABASE_URL'))
+    'default': dj_database_url.config(
+        default=os.environ.get('DATABASE_URL'),
+        conn_max_age=env.int('DB_CONN_MAX_AGE', 60),
+        conn_health_checks=env.bool('DB_CONN_HEALTH_CHECKS', True),
+        disable_server_side_cursors=env.bool('DB_PGBOUNCER', False),
+    )
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': env('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env('CACHE_LOCATION', ''),
+    }
 }
 
+CATALOGUE_CACHE_TIMEOUT = env.int('CATALOGUE_CACHE_TIMEOUT', 60 * 60)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'star_burger.metrics': {
+            'handlers': ['console'],
+            'level': REQUEST_METRICS_LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'foodcartapp.renderers.FastJSONRenderer',
+    ],
+}
+
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('rest_framework.renderers.BrowsableAPIRenderer')
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',